@@ -1,7 +1,26 @@
-import plotly.express as px
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+import plotly.io as pio
 import streamlit as st
 import pandas as pd
+import numpy as np
+import threading
+import argparse
+import json
+
+from pemuat_data import PATH_DATA, UKURAN_CHUNK
+from ingesti import FOLDER_DELTA, muat_dataset, sinkron_delta, snapshot_dataset
+from agregasi import MODE_HITUNG, agregat_demografi, baca_cube_streaming, buat_indeks_filter, halaman_urutan, posisi_per_nilai, presisi_cube, slice_cube
+from sketsa import PRESISI_HLL, RENTANG_PRESISI_HLL, galat_hll, presisi_sketsa
+from peta import DIMENSI_PETA, LEVEL_PETA, buat_bin_peta, sel_peta
+from retensi import DIMENSI_RETENSI, kurva_kaplan_meier, matriks_tenure, ringkasan_retensi
+from layanan_tambahan import buat_bitset, lift_addon
+from simulasi import buat_prekomputasi, simulasi_retensi
+from skor_churn import LEBAR_KELOMPOK_TENURE, STATUS_AKTIF, segmen_risiko, skor_dataset
+from api_agregat import jalankan_di_latar
+from backend_sql import BACKEND, baca_cube_sql
+from instrumentasi import bagian, catatan_run, mulai_run, pantau_cache, tulis_prometheus, ukur
+from penjadwal import PenjadwalBagian
+from validasi import validasi_dataset
 
 # Konfigurasi awal streamlit
 st.set_page_config(
@@ -10,26 +29,106 @@ st.set_page_config(
     layout = "wide"
 )
 
+# Cache hasil agregat: dikunci versi dataset (bukan hash DataFrame), hanya menyimpan
+# hasil yang bisa diserialisasi, dengan TTL & jumlah entri yang dibatasi.
+# Hit/miss setiap cache dicatat oleh panel instrumentasi. Tanpa spinner: cache ini dihitung di
+# thread pool penjadwal section, progres ditampilkan oleh placeholder section
+CACHE_TTL = 60 * 60
+CACHE_MAX_ENTRIES = 64
+cache_agregat = pantau_cache(st.cache_data(ttl = CACHE_TTL, max_entries = CACHE_MAX_ENTRIES, show_spinner = False))
+# Indeks (array seukuran jumlah baris) tidak diserialisasi dan bisa berukuran puluhan MB per entri,
+# sehingga entrinya lebih sedikit & ikut kedaluwarsa
+CACHE_INDEKS_MAX_ENTRIES = 8
+cache_indeks = pantau_cache(st.cache_resource(ttl = CACHE_TTL, max_entries = CACHE_INDEKS_MAX_ENTRIES, show_spinner = False))
+
+# Template layout yang dipakai bersama semua grafik, digabung sekali dengan template plotly lalu
+# dijadikan default: template default divalidasi sekali, bukan di-copy ulang untuk setiap figur
+pio.templates['telco'] = pio.templates.merge_templates('plotly', go.layout.Template(
+    layout = dict(
+        autosize = False,
+        showlegend = False,
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+    )
+))
+pio.templates.default = 'telco'
+
 # Ekstrak data & cleansing
+@pantau_cache(st.cache_resource)
+def ekstrak_data(path_data = PATH_DATA, folder_delta = FOLDER_DELTA, streaming = False, ukuran_chunk = UKURAN_CHUNK, jumlah_proses = 1,
+                 mode_hitung = 'auto', presisi_hll = PRESISI_HLL, backend = 'pandas'):
+    # Ekstraksi data dengan skema eksplisit (kolom yang tidak dipakai dilewati saat parsing),
+    # warm start membaca snapshot Arrow tanpa parsing ulang csv. Frame, cube agregat & versi
+    # disimpan satu kali per proses (salinan per proses) dan dipakai bersama oleh semua session
+    if streaming:
+        # Csv lebih besar dari RAM: hanya cube agregat yang disimpan, frame penuh tidak pernah dimuat
+        cube, versi_data = baca_cube_streaming(path_data, ukuran_chunk, mode_hitung, presisi_hll)
+        dataset = {
+            'data' : None,
+            'cube' : cube,
+            'versi' : versi_data,
+            'keterangan' : f"Streaming mode: {cube['total_customer'].sum()} rows aggregated in chunks, the raw table is not loaded"
+        }
+    elif backend != 'pandas':
+        # Data baris disimpan di database tertanam (.cache/) yang dipakai bersama semua proses app;
+        # proses hanya memegang cube hasil query agregat (pushdown)
+        cube, versi_data = baca_cube_sql(path_data, backend, mode_hitung, ukuran_chunk)
+        dataset = {
+            'data' : None,
+            'cube' : cube,
+            'versi' : versi_data,
+            'keterangan' : f"{backend} backend: {cube['total_customer'].sum()} rows aggregated in the embedded database, the raw table is not loaded"
+        }
+    else:
+        dataset = muat_dataset(path_data, folder_delta, jumlah_proses, mode_hitung, presisi_hll)
+
+    dataset['kunci'] = threading.Lock()
+
+    return (dataset)
+
 @st.cache_resource
-def ekstrak_data(url_data):
-    #Ekstraksi data
-    raw_data = pd.read_csv(url_data)
+def api_agregat(_dataset, path_data, port):
+    # API json agregat di thread latar, satu server per proses & sumber data, memakai dataset yang sama
+    return (jalankan_di_latar(_dataset, port = port))
 
-    # Copy data ke variabel baru
-    data = raw_data.copy()
-    
-    # Transformasi nama kolom menjadi lowercase
-    data.columns = data.columns.str.lower()
-    data.columns = data.columns.str.replace(' ', '_')
+@st.cache_resource
+def penjadwal_bagian():
+    return (PenjadwalBagian())
+
+def data_terkini(dataset):
+    # Delta harian yang baru masuk diterapkan inkremental (upsert + update cube), versi dataset
+    # ikut naik sehingga semua cache yang dikunci versi otomatis ter-invalidasi. Snapshot Arrow untuk worker
+    # diambil di bawah lock yang sama agar cocok dengan frame & versi run ini
+    with dataset['kunci']:
+        if dataset['data'] is None:
+            return (None, dataset['cube'], dataset['versi'], None)
+        sinkron_delta(dataset)
+        return (dataset['data'], dataset['cube'], dataset['versi'], snapshot_dataset(dataset))
 
-    # Drop some columns
-    data = data.drop(columns = ['zip_code',	'latitude',	'longitude'])
+# Figur disimpan sebagai JSON per versi agregat; setiap session membangun objek figurnya sendiri
+@cache_agregat
+def json_figur(nama, versi_data, kunci, _buat_figur):
+    return (_buat_figur().to_json())
 
-    return (data)
+def figur(nama, versi_data, kunci, buat_figur):
+    return (json.loads(json_figur(nama, versi_data, kunci, buat_figur)))
+
+def keterangan_hitung(row, presisi_hll):
+    # Error bound ditampilkan jika jumlah customer berasal dari sketsa HyperLogLog
+    if presisi_hll is not None:
+        row.caption(f'Customer counts are HyperLogLog estimates (standard error ±{galat_hll(presisi_hll):.1%})')
+
+# Bitmap posisi baris cube per status & gender untuk filter demografi
+@cache_indeks
+def indeks_filter(_cube, versi_data):
+    return (buat_indeks_filter(_cube))
+
+# Hasil filter demografi di-memoize per tuple status terpilih (LRU)
+@cache_agregat
+def filter_demografi(_indeks, versi_data, status):
+    return (agregat_demografi(_indeks, status))
 
 # Ornamen pada header
-@st.cache_resource
 def header():
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     
@@ -53,8 +152,17 @@ def header():
         unsafe_allow_html = True
     )
 
-@st.cache_resource       
-def tampilkan_data(data):
+# Indeks baris tabel data per versi dataset
+@cache_indeks
+def indeks_nilai(_data, versi_data, kolom):
+    return (posisi_per_nilai(_data, kolom))
+
+@cache_agregat
+def ringkasan_data(_data, versi_data):
+    return (_data.describe(include = 'all').T)
+
+@ukur('tampilkan_data', baris = lambda data, versi_data: len(data))
+def tampilkan_data(data, versi_data):
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Data')
     row1.markdown(
@@ -74,58 +182,168 @@ def tampilkan_data(data):
     )
     
     spacer1, row4, spacer2 = st.columns([0.1, 7.2, 0.1])
-    row4.dataframe(data)
+    mode = row4.radio(
+        label = 'View',
+        options = ['Rows', 'Summary statistics'],
+        horizontal = True
+    )
 
-# Hitung banyak customer yang dikelompokkan berdasarkan status
-@st.cache_resource
-def perhitungan_customer_status(data):
-    # Hitung total data (unik) customer id per status customernya
-    cust_status = data.groupby(['customer_status'], as_index = False).agg(total_cust_status = ('customer_id', pd.Series.nunique))
-
-    # Buat grafik pie
-    fig = px.pie(
-        cust_status, 
-        values = 'total_cust_status', 
-        names = 'customer_status',
-        #hover_data = ['total_cust_status'], 
-        labels = {
-            'customer_status' : 'Customer Status',
-            'total_cust_status' : 'Total Customer'
-        },
-        color = 'customer_status',
-        color_discrete_map = {
-            'Churned' : '#ff0000',
-            'Stayed' : '#5bb450',
-            'Joined' : '#72bf6a'                                 
-        }
+    if mode == 'Summary statistics':
+        row4.dataframe(ringkasan_data(data, versi_data))
+        return
+
+    kolom_kategori = [x for x in data.columns if isinstance(data[x].dtype, pd.CategoricalDtype)]
+
+    spacer1, row5, row6, row7, spacer2 = st.columns([0.1, 3.6, 1.8, 1.8, 0.1])
+    kolom_dipilih = row5.multiselect(
+        label = 'Columns',
+        options = list(data.columns),
+        default = list(data.columns)
+    )
+    kolom_sort = row6.selectbox(
+        label = 'Sort by',
+        options = [None] + list(data.columns)
+    )
+    ascending = row7.toggle(
+        label = 'Ascending',
+        value = True
     )
 
-    fig.update_traces(
-        textposition = 'inside', 
-        textinfo = 'percent+label',
-        pull = [0.1, 0, 0]
+    spacer1, row8, row9, row10, row11, spacer2 = st.columns([0.1, 1.8, 1.8, 1.8, 1.8, 0.1])
+    kolom_filter = row8.selectbox(
+        label = 'Filter column',
+        options = [None] + kolom_kategori
     )
 
+    # Posisi baris kandidat (urut naik); urutan sort hanya dihitung untuk jendela halaman yang tampil
+    posisi_filter = np.arange(len(data))
+    if kolom_filter is not None:
+        posisi = indeks_nilai(data, versi_data, kolom_filter)
+        nilai_filter = row9.multiselect(
+            label = 'Filter value',
+            options = list(posisi)
+        )
+        if nilai_filter:
+            posisi_filter = np.sort(np.concatenate([posisi[x] for x in nilai_filter]))
+
+    jumlah_per_halaman = row10.selectbox(
+        label = 'Rows per page',
+        options = [25, 50, 100, 500],
+        index = 1
+    )
+
+    total_halaman = max(1, -(-len(posisi_filter) // jumlah_per_halaman))
+
+    halaman = row11.number_input(
+        label = f'Page (of {total_halaman})',
+        min_value = 1,
+        max_value = total_halaman,
+        value = 1
+    )
+
+    # Hanya jendela baris & kolom yang dipilih yang dikirim ke browser
+    posisi_halaman = halaman_urutan(data, kolom_sort, ascending, posisi_filter, (halaman - 1) * jumlah_per_halaman, jumlah_per_halaman)
+    posisi_kolom = [data.columns.get_loc(x) for x in kolom_dipilih]
+
+    spacer1, row12, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row12.dataframe(
+        data.iloc[posisi_halaman, posisi_kolom],
+        hide_index = True
+    )
+    row12.caption(f'Showing {len(posisi_halaman)} of {len(posisi_filter)} rows')
+
+@cache_agregat
+def laporan_kualitas(path_data, versi_data, _data, ukuran_chunk):
+    # Validasi aturan kamus data dalam satu pass tervektorisasi, per versi dataset (termasuk delta yang
+    # sudah diterapkan). Laporan disimpan per versi di disk sehingga warm start hanya membaca json
+    return (validasi_dataset(path_data, _data, versi_data, ukuran_chunk))
+
+@ukur('tampilkan_kualitas', baris = lambda kualitas: kualitas['total_baris'])
+def tampilkan_kualitas(kualitas):
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row1.header('Data Quality')
+
+    aturan = pd.DataFrame(kualitas['aturan'])
+    gagal = aturan[aturan['pelanggaran'] > 0]
+
+    spacer1, row2, row3, row4, spacer2 = st.columns([0.1, 3, 3, 3, 0.1])
+    row2.metric('Rows checked', f"{kualitas['total_baris']:,}")
+    row3.metric('Rules checked', len(aturan))
+    row4.metric('Rules violated', len(gagal))
+
+    spacer1, row5, spacer2 = st.columns([0.1, 7.2, 0.1])
+    if gagal.empty:
+        row5.success('All rows satisfy the data dictionary rules')
+    else:
+        row5.warning(f"{gagal['pelanggaran'].sum():,} rule violations are included in the aggregates below")
+
+    semua = row5.toggle('Show passing rules', value = False, key = 'kualitas_semua')
+    tampil = (aturan if semua else gagal).sort_values('pelanggaran', ascending = False)
+    if not tampil.empty:
+        row5.dataframe(
+            pd.DataFrame({
+                'Rule' : tampil['aturan'],
+                'Type' : tampil['jenis'],
+                'Violations' : tampil['pelanggaran'],
+                'Share Of Rows' : (tampil['pelanggaran'] / max(kualitas['total_baris'], 1)).round(4),
+                'Example Customer IDs' : tampil['contoh'].map(', '.join)
+            }),
+            hide_index = True,
+            use_container_width = True
+        )
+    row5.caption('Domains, nullability and the revenue identity come from telecom_data_dictionary.csv; '
+                 'values outside a category domain are read as empty and reported as nullability / domain violations')
+
+# Hitung banyak customer yang dikelompokkan berdasarkan status
+@cache_agregat
+def hitung_customer_status(_cube, versi_data):
+    # Hitung total customer per status customernya dari cube
+    cust_status = slice_cube(_cube, ['customer_status']).rename(columns = {'total_customer' : 'total_cust_status'})
+
+    return (cust_status)
+
+def pie_customer_status(cust_status):
+    warna_status = {
+        'Churned' : '#ff0000',
+        'Stayed' : '#5bb450',
+        'Joined' : '#72bf6a'
+    }
+    label = cust_status['customer_status'].astype(str)
+
+    # Buat grafik pie langsung dari hasil agregat
+    fig = go.Figure(
+        go.Pie(
+            labels = label,
+            values = cust_status['total_cust_status'],
+            marker = dict(colors = [warna_status[x] for x in label]),
+            textposition = 'inside',
+            textinfo = 'percent+label',
+            pull = [0.1, 0, 0],
+            hovertemplate = 'Customer Status=%{label}<br>Total Customer=%{value}<extra></extra>'
+        )
+    )
 
     fig.update_layout(
-        autosize = False,
         width = 400,
-        height = 450,
-        showlegend = False,
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+        height = 450
     )
 
+    return (fig)
+
+def perhitungan_customer_status(cube, versi_data):
+    cust_status = hitung_customer_status(cube, versi_data)
+    fig = figur('customer_status', versi_data, None, lambda: pie_customer_status(cust_status))
+
     return (cust_status, fig)
 
-@st.cache_resource
-def tampilkan_status_customer(data):
+@ukur('tampilkan_status_customer', baris = lambda cube, versi_data: len(cube))
+def tampilkan_status_customer(cube, versi_data):
     
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Visualization')
     
     spacer1, row1, spacer2, row2, spacer3 = st.columns([0.1, 4, 0.1, 3.2, 0.1])
-    cust_status, fig = perhitungan_customer_status(data)
+    cust_status, fig = perhitungan_customer_status(cube, versi_data)
     
     total_cust_churn = cust_status[cust_status['customer_status'] == 'Churned']['total_cust_status'].values[0]
     total_joined_churn = cust_status[cust_status['customer_status'] == 'Joined']['total_cust_status'].values[0]
@@ -135,6 +353,7 @@ def tampilkan_status_customer(data):
         fig, 
         use_container_width = False
     )
+    keterangan_hitung(row1, presisi_cube(cube))
     
     row2.markdown(f"""
         Based on the pie, it can been observed that <b>{total_cust_churn}</b> 
@@ -150,11 +369,12 @@ def tampilkan_status_customer(data):
         unsafe_allow_html = True                               
     )
 
-@st.cache_resource
-def perhitungan_churn_reason(data):
+@cache_agregat
+def hitung_churn_reason(_cube, versi_data):
     
     # Hitung total data cust
-    cust_churn_category = data.groupby(['churn_category', 'churn_reason'], as_index = False).agg(total_cust_churn_per_reason = ('customer_id', pd.Series.nunique))
+    cust_churn_category = slice_cube(_cube, ['churn_category', 'churn_reason']).rename(columns = {'total_customer' : 'total_cust_churn_per_reason'})
+    cust_churn_category = cust_churn_category.drop(columns = ['total_revenue'])
 
     cust_churn_category['total_cust_churn_per_category'] = cust_churn_category.groupby(['churn_category'], as_index = False)['total_cust_churn_per_reason'].transform(sum)
 
@@ -171,24 +391,36 @@ def perhitungan_churn_reason(data):
     cust_churn_category['index_largest'] = ['largest' if x == 1 else '' for x in cust_churn_category['index_largest']]
     cust_churn_category['text'] = cust_churn_category['churn_reason'] + '<br> (' + cust_churn_category['total_cust_churn_per_reason'].astype(str) + ')'
 
-    fig = px.bar(
-        cust_churn_category, 
-        x = "total_cust_churn_per_reason", 
-        y = "churn_category", 
-        color = "index_largest", 
-        color_discrete_map = {
-            'largest' : '#FF0000',
-            '' : '#F4b4b4'
-        },
-        orientation = 'h',
-        text = "text",
-    )
+    return (cust_churn_category)
+
+def bar_churn_reason(cust_churn_category):
+    warna_reason = {
+        'largest' : '#FF0000',
+        '' : '#F4b4b4'
+    }
+
+    # Satu trace per warna (alasan terbesar per kategori vs lainnya), ditumpuk horizontal
+    fig = go.Figure()
+    for kelompok in cust_churn_category['index_largest'].unique():
+        baris_kelompok = cust_churn_category[cust_churn_category['index_largest'] == kelompok]
+        fig.add_trace(
+            go.Bar(
+                x = baris_kelompok['total_cust_churn_per_reason'],
+                y = baris_kelompok['churn_category'].astype(str),
+                orientation = 'h',
+                text = baris_kelompok['text'],
+                name = kelompok,
+                marker = dict(color = warna_reason[kelompok]),
+                customdata = baris_kelompok['churn_reason'],
+                hovertemplate = '<b>%{y}</b><br>'\
+                                '%{text}<br>'
+            )
+        )
 
     fig.update_layout(
-        autosize = False,
+        barmode = 'relative',
         width = 650,
         height = 400,
-        showlegend = False,
         xaxis=dict(
             title = "",
             zeroline=False,
@@ -203,28 +435,24 @@ def perhitungan_churn_reason(data):
         ),
         font = dict(
             size = 9
-        ),
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+        )
     )
 
-    hovertemplate = '<b>%{y}</b><br>'\
-                    '%{text}<br>'
-                    
-    fig.update_traces(
-        hovertemplate = hovertemplate, 
-        customdata = cust_churn_category["churn_reason"]
-    )
+    return (fig)
+
+def perhitungan_churn_reason(cube, versi_data):
+    cust_churn_category = hitung_churn_reason(cube, versi_data)
+    fig = figur('churn_reason', versi_data, None, lambda: bar_churn_reason(cust_churn_category))
 
     return(cust_churn_category, fig)
 
-@st.cache_resource
-def tampilkan_alasan_churn(data):
+@ukur('tampilkan_alasan_churn', baris = lambda cube, versi_data: len(cube))
+def tampilkan_alasan_churn(cube, versi_data):
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Reason for Customer Churn?')
     
     spacer1, row1, row2 = st.columns([0.1, 5, 6])
-    cust_churn_category, fig = perhitungan_churn_reason(data)
+    cust_churn_category, fig = perhitungan_churn_reason(cube, versi_data)
     
     row1.markdown(f"""
        <br> Upon investigation, Upon investigation, it has been found that the primary reason for a significant number 
@@ -243,41 +471,29 @@ def tampilkan_alasan_churn(data):
         fig, 
         use_container_width = False
     )
+    keterangan_hitung(row2, presisi_cube(cube))
      
-def text_graph(text1, text2, color):
-    fig, [ax1, ax2] = plt.subplots(
-        nrows = 2, 
-        ncols = 1,
-        figsize = (1, 0.5)
-    )
-
-    ax1.text(
-        x = 0, 
-        y = 0.2, 
-        s = text1,
-        color = color,
-        fontsize = 14,
-        fontweight = 'light',
+def tile_revenue(row, text1, text2, color):
+    # Tile revenue dari komponen HTML native (tanpa render gambar matplotlib)
+    row.markdown(f"""
+        <div style="color: {color}; line-height: 1.3;">
+            <div style="font-size: 22px; font-weight: 300;">{text1}</div>
+            <div style="font-size: 30px; font-weight: 600;">{text2}</div>
+        </div>
+        """,
+        unsafe_allow_html = True
     )
 
-    ax2.text(
-        x = 0, 
-        y = 0.1, 
-        s = text2,
-        color = color,
-        fontsize = 18,
-        fontweight = 'semibold',
-    )
+@cache_agregat
+def hitung_revenue_per_status(_cube, versi_data):
+    # Hitung total revenue per status customernya dari cube
+    revenue_per_status = slice_cube(_cube, ['customer_status'])
 
-    ax1.axis('off')
-    ax2.axis('off')
-    
-    return fig 
+    return (revenue_per_status)
 
-@st.cache_resource
-def tampilkan_revenue_impact(data):
-    # Hitung total data (unik) customer id per status customernya
-    revenue_per_status = data.groupby(['customer_status'], as_index = False).agg(total_revenue = ('total_revenue', pd.Series.sum))
+@ukur('tampilkan_revenue_impact', baris = lambda cube, versi_data: len(cube))
+def tampilkan_revenue_impact(cube, versi_data):
+    revenue_per_status = hitung_revenue_per_status(cube, versi_data)
 
     raw_revenue_stayed = revenue_per_status[revenue_per_status['customer_status'] == 'Stayed']['total_revenue'].values[0] 
     raw_revenue_joined = revenue_per_status[revenue_per_status['customer_status'] == 'Joined']['total_revenue'].values[0]
@@ -287,29 +503,15 @@ def tampilkan_revenue_impact(data):
     revenue_joined = round(raw_revenue_joined / 10**6, 2)
     revenue_churn = round(raw_revenue_churn / 10**6, 2)
     
-    fig1 = text_graph('Stayed', '$ ' + str(revenue_stayed) + 'M', '#5bb450')
-    fig2 = text_graph('Joined', '$ ' + str(revenue_joined) + 'M', '#5bb450')
-    fig3 = text_graph('Churn', '$ ' + str(revenue_churn) + 'M', '#ff0000')
-    
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Impact On The Company')
     
     spacer1, row2, row3, row4, spacer2 = st.columns([0.1, 3, 3, 3, 0.1])
     
-    row2.pyplot(
-        fig1, 
-        use_container_width = False
-    )
-    
-    row3.pyplot(
-        fig2, 
-        use_container_width = False
-    )
-    
-    row4.pyplot(
-        fig3, 
-        use_container_width = False
-    )
+    # '&#36;' agar '$' tidak dibaca sebagai LaTeX oleh markdown streamlit
+    tile_revenue(row2, 'Stayed', '&#36; ' + str(revenue_stayed) + 'M', '#5bb450')
+    tile_revenue(row3, 'Joined', '&#36; ' + str(revenue_joined) + 'M', '#5bb450')
+    tile_revenue(row4, 'Churn', '&#36; ' + str(revenue_churn) + 'M', '#ff0000')
     
     spacer1, row5, spacer2 = st.columns([0.1, 7.2, 0.1])
     row5.markdown(f"""
@@ -322,27 +524,364 @@ def tampilkan_revenue_impact(data):
         unsafe_allow_html = True
     )
 
+# Simulator what-if: ringkasan per segmen (prefix sum revenue churn) disiapkan sekali per versi dataset,
+# setiap geser slider hanya membaca ringkasan ini
+@cache_indeks
+def prekomputasi_simulasi(_data, versi_data):
+    return (buat_prekomputasi(_data))
+
+@ukur('tampilkan_simulasi', baris = lambda data, versi_data: 0 if data is None else len(data))
+def tampilkan_simulasi(data, versi_data):
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row1.header('Retention What-If Simulator')
+
+    if data is None:
+        row1.info('The simulator needs the customer rows and is not available in streaming mode or with an SQL backend')
+        return
+
+    prekomputasi = prekomputasi_simulasi(data, versi_data)
+    kategori = list(prekomputasi['kategori'])
+
+    row1.markdown('Share of churned customers retained per churn category')
+    kolom_slider = st.columns([0.1] + [7.2 / len(kategori)] * len(kategori) + [0.1])[1:-1]
+    retensi_kategori = {
+        nama : row.slider(nama, 0, 100, 0, step = 5, format = '%d%%', key = f'simulasi_{nama}')
+        for row, nama in zip(kolom_slider, kategori)
+    }
+
+    spacer1, row2, row3, spacer2 = st.columns([0.1, 3.6, 3.6, 0.1])
+    persen_konversi = row2.slider('Convert Month-to-Month customers to One Year', 0, 100, 0, step = 5, format = '%d%%', key = 'simulasi_konversi')
+    nilai_tertinggi = row3.toggle('Retain highest-value churners first', value = True, key = 'simulasi_nilai_tertinggi')
+
+    hasil = simulasi_retensi(prekomputasi, retensi_kategori, persen_konversi, nilai_tertinggi)
+
+    spacer1, row4, row5, row6, spacer2 = st.columns([0.1, 3, 3, 3, 0.1])
+    row4.metric('Recovered revenue', f"${hasil['revenue'] / 10**6:,.2f}M", f"{hasil['porsi']:.1%} of lost revenue", delta_color = 'off')
+    row5.metric('Churners retained', f"{hasil['customer']:,.0f}")
+    row6.metric('Monthly charges kept', f"${hasil['bulanan']:,.0f}")
+
+    spacer1, row7, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row7.caption('Contract conversion assumes converted customers churn at the One Year rate instead of the Month-to-Month rate, '
+                 'applied to the Month-to-Month churn revenue not already retained above')
+
+# Skor risiko churn customer aktif, dihitung sekali per versi dataset
+@cache_indeks
+def skor_risiko(_data, _path_arrow, path_data, versi_data, jumlah_proses):
+    return (skor_dataset(_data, path_data, versi_data, _path_arrow, jumlah_proses))
+
+@cache_agregat
+def hitung_segmen_risiko(_data, _skor, versi_data):
+    return (segmen_risiko(_data, _skor))
+
+@ukur('tampilkan_risiko_churn', baris = lambda dataset, data, *args: 0 if data is None else len(data))
+def tampilkan_risiko_churn(dataset, data, path_arrow, versi_data, jumlah_proses = 1):
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row1.header('Churn Risk Of Active Customers')
+
+    if data is None:
+        row1.info('Churn risk scoring needs the customer rows and is not available in streaming mode or with an SQL backend')
+        return
+
+    skor = skor_risiko(data, path_arrow, str(dataset['path_data']), versi_data, jumlah_proses)
+    segmen = hitung_segmen_risiko(data, skor, versi_data)
+
+    spacer1, row2, row3, row4, spacer2 = st.columns([0.1, 3, 3, 3, 0.1])
+    row2.metric('Active customers', f"{segmen['total_customer'].sum():,}")
+    row3.metric('Expected churners', f"{segmen['ekspektasi_churn'].sum():,.0f}")
+    row4.metric('Monthly revenue at risk', f"${segmen['revenue_berisiko'].sum():,.0f}")
+
+    # Segmen dengan ekspektasi jumlah customer churn terbesar
+    top = segmen.head(10)
+    spacer1, row5, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row5.dataframe(
+        pd.DataFrame({
+            'Contract' : top['contract'].astype(str),
+            'Internet Type' : top['internet_type'].astype(object).fillna('No Internet Service'),
+            'Tenure (months)' : [f'{x}-{x + LEBAR_KELOMPOK_TENURE - 1}' for x in top['kelompok_tenure']],
+            'Customers' : top['total_customer'],
+            'Avg Risk' : top['rata_risiko'].round(3),
+            'Expected Churners' : top['ekspektasi_churn'].round(1),
+            'Monthly Revenue At Risk ($)' : top['revenue_berisiko'].round(2)
+        }),
+        hide_index = True,
+        use_container_width = True
+    )
+    row5.caption(f"Risk is the churn probability from a logistic regression on service, contract, tenure and charge columns, "
+                 f"scored for {' & '.join(STATUS_AKTIF)} customers")
+
+# Retensi: matriks tenure x segmen untuk semua dimensi dihitung sekali per versi dataset,
+# kurva per dimensi diturunkan dari matriks (ganti segmen tidak menyentuh data baris)
+@cache_indeks
+def matriks_retensi(_data, versi_data):
+    return ({x : matriks_tenure(_data, x) for x in DIMENSI_RETENSI})
+
+@cache_agregat
+def hitung_retensi(_matriks, versi_data, dimensi):
+    kurva = kurva_kaplan_meier(_matriks[dimensi])
+    return (kurva, ringkasan_retensi(kurva, _matriks[dimensi]))
+
+def kurva_retensi(kurva, dimensi):
+    fig = go.Figure()
+    for segmen in kurva.columns:
+        fig.add_trace(
+            go.Scatter(
+                x = kurva.index,
+                y = kurva[segmen],
+                mode = 'lines',
+                line = dict(shape = 'hv'),
+                name = segmen,
+                hovertemplate = f'{segmen}<br>Tenure=%{{x}} months<br>Retention=%{{y:.1%}}<extra></extra>'
+            )
+        )
+
+    fig.update_layout(
+        width = 800,
+        height = 400,
+        showlegend = True,
+        legend = dict(title = DIMENSI_RETENSI[dimensi]),
+        xaxis = dict(
+            title = 'Tenure in Months',
+            zeroline = False,
+            showgrid = False
+        ),
+        yaxis = dict(
+            title = 'Share of Customers Retained',
+            tickformat = '.0%',
+            range = [0, 1.02],
+            showgrid = False
+        )
+    )
+
+    return (fig)
+
+@ukur('tampilkan_retensi', baris = lambda data, versi_data: 0 if data is None else len(data))
+def tampilkan_retensi(data, versi_data):
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row1.header('Customer Retention By Tenure')
+
+    if data is None:
+        row1.info('Retention curves need the customer rows and are not available in streaming mode or with an SQL backend')
+        return
+
+    dimensi = row1.selectbox(
+        'Segment by',
+        list(DIMENSI_RETENSI),
+        format_func = lambda x: DIMENSI_RETENSI[x],
+        key = 'dimensi_retensi'
+    )
+
+    matriks = matriks_retensi(data, versi_data)
+    kurva, ringkasan = hitung_retensi(matriks, versi_data, dimensi)
+    fig = figur('retensi', versi_data, dimensi, lambda: kurva_retensi(kurva, dimensi))
+
+    row1.plotly_chart(
+        fig,
+        use_container_width = False
+    )
+    row1.dataframe(ringkasan.round(3), hide_index = True, use_container_width = True)
+    row1.caption('Kaplan-Meier estimate: churned customers are events at their tenure, Stayed & Joined customers are censored')
+
+# Peta churn: bin spasial semua level dihitung sekali per versi dataset; zoom & filter hanya
+# menjumlahkan bin, browser menerima satu titik per sel (bukan per customer)
+@cache_indeks
+def bin_peta(_data, versi_data):
+    return (buat_bin_peta(_data))
+
+@cache_agregat
+def hitung_sel_peta(_bin, versi_data, level, filter_dimensi):
+    return (sel_peta(_bin[level], dict(filter_dimensi)))
+
+def peta_churn(sel, level):
+    fig = go.Figure(
+        go.Scattermap(
+            lat = sel['latitude'],
+            lon = sel['longitude'],
+            mode = 'markers',
+            marker = dict(
+                size = 6 + 24 * np.sqrt(sel['total_customer'] / max(sel['total_customer'].max(), 1)),
+                color = sel['churn_rate'],
+                colorscale = 'RdYlGn_r',
+                cmin = 0,
+                cmax = 1,
+                opacity = 0.8,
+                colorbar = dict(title = 'Churn Rate', tickformat = '.0%')
+            ),
+            customdata = np.stack([sel['total_customer'], sel['churned'], sel['revenue_hilang']], axis = -1),
+            text = sel['lokasi'],
+            hovertemplate = '<b>%{text}</b><br>Customers=%{customdata[0]}<br>Churned=%{customdata[1]}'\
+                            '<br>Churn Rate=%{marker.color:.1%}<br>Lost Revenue=$%{customdata[2]:,.0f}<extra></extra>'
+        )
+    )
+
+    fig.update_layout(
+        width = 800,
+        height = 550,
+        margin = dict(l = 0, r = 0, t = 0, b = 0),
+        map = dict(
+            style = 'carto-positron',
+            center = dict(lat = float(sel['latitude'].mean()), lon = float(sel['longitude'].mean())),
+            zoom = LEVEL_PETA[level]['zoom']
+        )
+    )
+
+    return (fig)
+
+@ukur('tampilkan_peta', baris = lambda data, versi_data: 0 if data is None else len(data))
+def tampilkan_peta(data, versi_data):
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row1.header('Churn By Location')
+
+    if data is None:
+        row1.info('The churn map needs the customer rows and is not available in streaming mode or with an SQL backend')
+        return
+
+    bins = bin_peta(data, versi_data)
+
+    level = row1.select_slider('Map level', list(LEVEL_PETA), value = 'City', key = 'level_peta')
+    spacer1, row2, row3, spacer2 = st.columns([0.1, 3.6, 3.6, 0.1])
+    filter_dimensi = []
+    for row, dimensi in zip([row2, row3], DIMENSI_PETA):
+        opsi = sorted(bins[level][dimensi].astype(str).unique())
+        terpilih = row.multiselect(dimensi.replace('_', ' ').title(), opsi, default = opsi, key = f'peta_{dimensi}')
+        if len(terpilih) < len(opsi):
+            filter_dimensi.append((dimensi, tuple(sorted(terpilih))))
+    filter_dimensi = tuple(filter_dimensi)
+
+    sel = hitung_sel_peta(bins, versi_data, level, filter_dimensi)
+    spacer1, row4, spacer2 = st.columns([0.1, 7.2, 0.1])
+    if sel.empty:
+        row4.info('No customers match the selected filters')
+        return
+
+    if 'grid' in LEVEL_PETA[level]:
+        sel['lokasi'] = [f'{x:.2f}, {y:.2f}' for x, y in zip(sel['latitude'], sel['longitude'])]
+    else:
+        sel['lokasi'] = sel['sel']
+
+    fig = figur('peta', versi_data, (level, filter_dimensi), lambda: peta_churn(sel, level))
+    row4.plotly_chart(
+        fig,
+        use_container_width = False
+    )
+
+    top = sel.sort_values('revenue_hilang', ascending = False).head(10)
+    row4.dataframe(
+        pd.DataFrame({
+            'Location' : top['lokasi'],
+            'Customers' : top['total_customer'],
+            'Churned' : top['churned'],
+            'Churn Rate' : top['churn_rate'].round(3),
+            'Lost Revenue ($)' : top['revenue_hilang'].round(2)
+        }),
+        hide_index = True,
+        use_container_width = True
+    )
+    row4.caption(f'{len(sel)} map cells at this level, {sel["total_customer"].sum()} customers')
+
+# Lift add-on: bitset per add-on & status dibangun sekali per versi dataset, hitungan setiap
+# add-on & pasangan add-on per filter status diperoleh dari AND + popcount bitset
+@cache_indeks
+def bitset_addon(_data, versi_data):
+    return (buat_bitset(_data))
+
+@cache_agregat
+def hitung_lift_addon(_bitset, versi_data, status):
+    return (lift_addon(_bitset, status))
+
+def label_addon(kolom):
+    return (kolom.replace('_', ' ').title())
+
+def heatmap_lift(lift):
+    label = [label_addon(x) for x in lift.index]
+
+    # Diagonal = add-on tunggal, sel lain = customer yang berlangganan kedua add-on
+    fig = go.Figure(
+        go.Heatmap(
+            z = lift.to_numpy(),
+            x = label,
+            y = label,
+            colorscale = 'RdYlGn_r',
+            zmid = 1,
+            colorbar = dict(title = 'Lift'),
+            hovertemplate = '%{y} + %{x}<br>Lift=%{z:.2f}<extra></extra>'
+        )
+    )
+
+    fig.update_layout(
+        width = 800,
+        height = 600,
+        xaxis = dict(showgrid = False),
+        yaxis = dict(showgrid = False, autorange = 'reversed')
+    )
+
+    return (fig)
+
+def perhitungan_lift_addon(data, versi_data, status):
+    lift = hitung_lift_addon(bitset_addon(data, versi_data), versi_data, status)
+    fig = figur('lift_addon', versi_data, status, lambda: heatmap_lift(lift['lift']))
+
+    return (lift, fig)
+
+@ukur('tampilkan_addon', baris = lambda data, versi_data: 0 if data is None else len(data))
+def tampilkan_addon(data, versi_data):
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row1.header('Add-On Services And Churn')
+
+    if data is None:
+        row1.info('Add-on lift needs the customer rows and is not available in streaming mode or with an SQL backend')
+        return
+
+    opsi = sorted(bitset_addon(data, versi_data)['status'])
+    status = row1.multiselect('Customer Status', opsi, default = opsi, key = 'status_addon')
+    if not status:
+        row1.info('Select at least one customer status')
+        return
+
+    lift, fig = perhitungan_lift_addon(data, versi_data, tuple(sorted(status)))
+    row1.caption(f"{lift['total_customer']} customers, overall churn rate {lift['churn_rate']:.1%}. "
+                 'Lift is the churn rate of customers with the add-on (or both add-ons) divided by the overall churn rate')
+    row1.plotly_chart(
+        fig,
+        use_container_width = False
+    )
+
+    hasil = lift['hasil'].sort_values('lift', ascending = False)
+    row1.dataframe(
+        pd.DataFrame({
+            'Add-On' : hasil['addon_1'].map(label_addon),
+            'With' : hasil['addon_2'].map(label_addon, na_action = 'ignore').fillna('-'),
+            'Customers' : hasil['total_customer'],
+            'Churned' : hasil['churned'],
+            'Churn Rate' : hasil['churn_rate'].round(3),
+            'Lift' : hasil['lift'].round(2)
+        }),
+        hide_index = True,
+        use_container_width = True
+    )
+
 # All Demografi
-def count_per_gender(data):
-    count_data_per_gender = data.groupby(['gender'], as_index = False).agg(count_data_per_gender = ('customer_id', pd.Series.nunique))
-    count_male_data = count_data_per_gender[count_data_per_gender['gender'] == 'Male']['count_data_per_gender'].values[0]
-    count_female_data = count_data_per_gender[count_data_per_gender['gender'] == 'Female']['count_data_per_gender'].values[0]
+def count_per_gender(agregat):
+    count_male_data = agregat['Male']['total']
+    count_female_data = agregat['Female']['total']
     return (count_male_data, count_female_data)
 
-def distribusi_umur(data, gender, color):
-    fig = px.histogram(
-        data[data['gender'] == gender], 
-        x = "age",
-        nbins = 10,
-        color_discrete_sequence=[color]
+def distribusi_umur(agregat, gender, color):
+    umur_per_gender = agregat[gender]['kelompok_umur']
+
+    # Histogram dari jumlah per kelompok umur yang sudah dihitung, tanpa binning ulang data mentah
+    fig = go.Figure(
+        go.Bar(
+            x = [f'{x}-{x + 9}' for x in umur_per_gender.index],
+            y = umur_per_gender.values,
+            marker = dict(color = color),
+            hovertemplate = 'age=%{x}<br>count=%{y}<extra></extra>'
+        )
     )
 
     fig.update_layout(
-        autosize = False,
         width = 500,
         height = 400,
         bargap = 0.02,
-        showlegend = False,
         xaxis = dict(
             title = f"Customer Age Distribution<br>{gender}",
             zeroline = False,
@@ -356,71 +895,57 @@ def distribusi_umur(data, gender, color):
         ),
         font = dict(
             size=9
-        ),
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+        )
     )
 
     return fig
 
-def married_status(data, gender, color):
-    married_per_gender = data[data['gender'] == gender].groupby(['married'], as_index = False).agg(married_per_gender = ('customer_id', pd.Series.nunique))
+def married_status(agregat, gender, color):
+    married_per_gender = agregat[gender]['married']
+    warna_married = {
+        'Yes' : color[0],
+        'No' : color[1]
+    }
 
-    fig = px.pie(
-        married_per_gender, 
-        values = 'married_per_gender', 
-        names = 'married',
-        labels = {
-            'married' : 'is Married?',
-            'married_per_gender' : 'Total Customer'
-        },
-        color = 'married',
-        color_discrete_map = {
-            'Yes' : color[0],
-            'No' : color[1]                                
-        },
-        hole = 0.5
-    )
-
-    fig.update_traces(
-        textposition = 'inside', 
-        textinfo = 'percent+label',
-        pull = [0.01, 0]
+    fig = go.Figure(
+        go.Pie(
+            labels = married_per_gender.index,
+            values = married_per_gender.values,
+            marker = dict(colors = [warna_married[x] for x in married_per_gender.index]),
+            hole = 0.5,
+            textposition = 'inside', 
+            textinfo = 'percent+label',
+            pull = [0.01, 0],
+            hovertemplate = 'is Married?=%{label}<br>Total Customer=%{value}<extra></extra>'
+        )
     )
 
-
     fig.update_layout(
-        autosize = False,
         width = 500,
         height = 400,
-        showlegend = False,
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)',
         annotations=[
             dict(
                 text = 'Married<br>Status', 
                 x = 0.5, 
                 y =0.5, 
-                font_size=20, 
+                font = dict(
+                    size = 20,
+                    family = "sans serif", 
+                    color = color[0]
+                ),
                 showarrow=False
             )
         ]
     )
-    
-    fig.update_annotations(
-        font = dict(
-            family = "sans serif", 
-            color = color[0]
-        )
-    )
                  
     return (fig)
 
-def contract_type(data, gender):
-    
-    data = data[data['gender'] == gender]
-    data['internet_type'] = data['internet_type'].fillna('No Internet Service')
-    internet_type_per_gender = data.groupby(['contract', 'internet_type'], as_index = False).agg(total_cust_per_internet_type = ('customer_id', pd.Series.nunique))
+def contract_type(agregat, gender):
+    internet_type_per_gender = agregat[gender]['contract_internet']
+    internet_type_per_gender = internet_type_per_gender[internet_type_per_gender['total_customer'] > 0]
+    contract = internet_type_per_gender['contract'].astype(str).to_numpy()
+    internet_type = internet_type_per_gender['internet_type'].fillna('No Internet Service').to_numpy()
+    total = internet_type_per_gender['total_customer'].to_numpy()
  
     if(gender == 'Male'):
         color_internet_type = {
@@ -438,41 +963,62 @@ def contract_type(data, gender):
             'DSL' : '#5A9F68',
             'No Internet Service' : '#BBD58E'                              
         }
-        
-    fig = px.treemap(
-        internet_type_per_gender, 
-        path = [
-            px.Constant('Contract Type'),
-            'contract',
-            'internet_type'
-        ], 
-        values = 'total_cust_per_internet_type',
-        color = 'internet_type',
-        color_discrete_map = color_internet_type,
-        title = f'Contract Status and Internet Type of <br>{gender}'
+
+    # Hirarki treemap (ids/parents/values) dari jumlah per contract x internet type.
+    # Node induk berwarna '(?)' jika anaknya terdiri dari lebih dari satu internet type
+    akar = 'Contract Type'
+    daftar_contract = list(dict.fromkeys(contract))
+    total_contract = [total[contract == x].sum() for x in daftar_contract]
+    warna_contract = [
+        color_internet_type[internet_type[contract == x][0]] if len(set(internet_type[contract == x])) == 1 else color_internet_type['(?)']
+        for x in daftar_contract
+    ]
+    warna_akar = color_internet_type[internet_type[0]] if len(set(internet_type)) == 1 else color_internet_type['(?)']
+
+    fig = go.Figure(
+        go.Treemap(
+            ids = [akar] + [f'{akar}/{x}' for x in daftar_contract] + [f'{akar}/{x}/{y}' for x, y in zip(contract, internet_type)],
+            parents = [''] + [akar] * len(daftar_contract) + [f'{akar}/{x}' for x in contract],
+            labels = [akar] + daftar_contract + list(internet_type),
+            values = [total.sum()] + total_contract + list(total),
+            branchvalues = 'total',
+            marker = dict(
+                colors = [warna_akar] + warna_contract + [color_internet_type[x] for x in internet_type],
+                cornerradius = 5
+            ),
+            hovertemplate = '%{label}<br>Total Customer=%{value}<extra></extra>'
+        )
     )
 
     fig.update_layout(
-        autosize = False,
+        title = f'Contract Status and Internet Type of <br>{gender}',
         width = 525,
-        height = 425,
-        showlegend = False,
-        xaxis = dict(
-            title = f"Customer Age Distribution<br>{gender}"
-        ),
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)'
-    )
-
-    fig.update_traces(
-        marker = dict(cornerradius = 5)
+        height = 425
     )
     
     return (fig)
     
     
-def tampilkan_demografi(data, url_img_man, url_img_woman):
-    male_color, female_color = '#fbe280', '#5bbc95'
+MALE_COLOR, FEMALE_COLOR = '#fbe280', '#5bbc95'
+
+def figur_demografi(indeks, versi_data, kunci):
+    male_color, female_color = MALE_COLOR, FEMALE_COLOR
+    agregat = filter_demografi(indeks, versi_data, kunci)
+
+    fig_hist_male = figur('umur', versi_data, (kunci, 'Male'), lambda: distribusi_umur(agregat, gender = 'Male', color = male_color))
+    fig_hist_female = figur('umur', versi_data, (kunci, 'Female'), lambda: distribusi_umur(agregat, gender = 'Female', color = female_color))
+
+    fig_pie_married_male = figur('married', versi_data, (kunci, 'Male'), lambda: married_status(agregat, gender = 'Male', color = ('#bfac60', male_color)))
+    fig_pie_married_female = figur('married', versi_data, (kunci, 'Female'), lambda: married_status(agregat, gender = 'Female', color = ('#469173', female_color)))
+    
+    fig_treemap_male = figur('contract', versi_data, (kunci, 'Male'), lambda: contract_type(agregat, gender = 'Male'))
+    fig_treemap_female = figur('contract', versi_data, (kunci, 'Female'), lambda: contract_type(agregat, gender = 'Female'))
+
+    return (agregat, (fig_hist_male, fig_pie_married_male, fig_treemap_male), (fig_hist_female, fig_pie_married_female, fig_treemap_female))
+
+@ukur('tampilkan_demografi', baris = lambda indeks, *args: len(indeks['total_customer']))
+def tampilkan_demografi(indeks, versi_data, url_img_man, url_img_woman):
+    male_color, female_color = MALE_COLOR, FEMALE_COLOR
     
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Customer Demographics by Status')
@@ -489,21 +1035,18 @@ def tampilkan_demografi(data, url_img_man, url_img_woman):
         )
         status = st.multiselect(
             label = 'Select Customer Status',
-            options = data['customer_status'].unique(),
-            default = 'Stayed'
+            options = list(indeks['bitmap']['customer_status']),
+            default = 'Stayed',
+            key = 'status_demografi'
         )
+        keterangan_hitung(st, presisi_sketsa(indeks['sketsa']) if 'sketsa' in indeks else None)
     
-    filter_data = data.loc[data['customer_status'].isin(status)]
+    kunci = tuple(sorted(status))
+    agregat, figur_male, figur_female = figur_demografi(indeks, versi_data, kunci)
 
-    count_male_data, count_female_data = count_per_gender(filter_data)
-    fig_hist_male = distribusi_umur(filter_data, gender = 'Male', color = male_color)
-    fig_hist_female = distribusi_umur(filter_data, gender = 'Female', color = female_color)
-
-    fig_pie_married_male = married_status(filter_data, gender = 'Male', color = ('#bfac60', male_color))
-    fig_pie_married_female = married_status(filter_data, gender = 'Female', color = ('#469173', female_color))
-    
-    fig_treemap_male = contract_type(filter_data, gender = 'Male')
-    fig_treemap_female = contract_type(filter_data, gender = 'Female')
+    count_male_data, count_female_data = count_per_gender(agregat)
+    fig_hist_male, fig_pie_married_male, fig_treemap_male = figur_male
+    fig_hist_female, fig_pie_married_female, fig_treemap_female = figur_female
     
     spacer1, row2, spacer, row3, spacer3 = st.columns([0.1, 3, 0.5, 3, 0.1])
     with row2:
@@ -585,18 +1128,143 @@ def tampilkan_demografi(data, url_img_man, url_img_woman):
         )
     
     
+def tampilkan_instrumentasi(path_metrik = None):
+    # Panel debug di sidebar: hanya muncul jika instrumentasi diaktifkan
+    catatan = pd.DataFrame(catatan_run())
+    if catatan.empty:
+        return
+
+    catatan['kb_terkirim'] = pd.to_numeric(catatan['byte_terkirim']) / 1024
+    catatan['delta_rss_proses_mb'] = pd.to_numeric(catatan['delta_rss_proses']) / 2**20
+
+    st.sidebar.header('Performance')
+    st.sidebar.dataframe(
+        catatan[['bagian', 'detik', 'baris', 'kb_terkirim', 'delta_rss_proses_mb', 'cache_hit', 'cache_miss']].round(3),
+        hide_index = True
+    )
+    st.sidebar.caption(f"Total {catatan['detik'].sum():.3f} s, {catatan['kb_terkirim'].sum():.1f} KB sent")
+
+    if path_metrik is not None:
+        tulis_prometheus(path_metrik)
+
+def baca_argumen():
+    # Argumen setelah `--`, mis. `streamlit run FinalProjectStreamlit.py -- --streaming --data export.csv`
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default = str(PATH_DATA))
+    parser.add_argument('--streaming', action = 'store_true')
+    parser.add_argument('--chunksize', type = int, default = UKURAN_CHUNK)
+    parser.add_argument('--workers', type = int, default = 1)
+    parser.add_argument('--count', choices = MODE_HITUNG, default = 'auto')
+    parser.add_argument('--hll-precision', type = int, choices = RENTANG_PRESISI_HLL, default = PRESISI_HLL, metavar = '{4..16}')
+    parser.add_argument('--debug', action = 'store_true')
+    parser.add_argument('--metrics-file')
+    parser.add_argument('--api-port', type = int)
+    parser.add_argument('--backend', choices = BACKEND, default = 'pandas')
+    args, _ = parser.parse_known_args()
+
+    return (args)
+
 if __name__ == "__main__":
+    args = baca_argumen()
+
+    # Instrumentasi opt-in: `-- --debug` untuk semua session atau `?debug=1` pada URL
+    debug = args.debug or st.query_params.get('debug') == '1'
+    mulai_run(debug)
+
     header()
+
+    # Placeholder semua section dipasang sebelum data & agregat apa pun dihitung
+    judul_bagian = {
+        'data' : 'Data',
+        'kualitas' : 'Data Quality',
+        'status' : 'Visualization',
+        'alasan' : 'Reason for Customer Churn?',
+        'revenue' : 'Impact On The Company',
+        'simulasi' : 'Retention What-If Simulator',
+        'risiko' : 'Churn Risk Of Active Customers',
+        'retensi' : 'Customer Retention By Tenure',
+        'peta' : 'Churn By Location',
+        'addon' : 'Add-On Services And Churn',
+        'demografi' : 'Customer Demographics by Status'
+    }
+    slot = {}
+    for nama, judul in judul_bagian.items():
+        slot[nama] = st.empty()
+        slot[nama].caption(f'Loading {judul}...')
     
-    url_data = 'https://raw.githubusercontent.com/clarytaputri/Claryta-Final-Project-Churn-Analytics/main/telecom_customer_churn.csv'
-    data = ekstrak_data(url_data)
-    
-    tampilkan_data(data)
-    tampilkan_status_customer(data)
-    tampilkan_alasan_churn(data)
-    tampilkan_revenue_impact(data)
-    
+    with bagian('ekstrak_data'):
+        dataset = ekstrak_data(
+            args.data,
+            streaming = args.streaming,
+            ukuran_chunk = args.chunksize,
+            jumlah_proses = args.workers,
+            mode_hitung = args.count,
+            presisi_hll = args.hll_precision,
+            backend = args.backend
+        )
+        data, cube, versi_data, path_arrow = data_terkini(dataset)
+
+    if args.api_port is not None:
+        api_agregat(dataset, args.data, args.api_port)
+
     url_img_man = 'https://raw.githubusercontent.com/clarytaputri/Claryta-Final-Project-Churn-Analytics/main/man.png'
     url_img_woman = 'https://raw.githubusercontent.com/clarytaputri/Claryta-Final-Project-Churn-Analytics/main/woman.png'
-    
-    tampilkan_demografi(data, url_img_man, url_img_woman)
+
+    def tampilkan_info_data():
+        spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+        row1.header('Data')
+        row1.info(dataset['keterangan'])
+
+    # Render setiap section (di thread script, satu-satunya thread yang boleh memanggil streamlit)
+    tampil = {
+        'data' : lambda: tampilkan_data(data, versi_data) if data is not None else tampilkan_info_data(),
+        'kualitas' : lambda: tampilkan_kualitas(laporan_kualitas(args.data, versi_data, data, args.chunksize)),
+        'status' : lambda: tampilkan_status_customer(cube, versi_data),
+        'alasan' : lambda: tampilkan_alasan_churn(cube, versi_data),
+        'revenue' : lambda: tampilkan_revenue_impact(cube, versi_data),
+        'simulasi' : lambda: tampilkan_simulasi(data, versi_data),
+        'risiko' : lambda: tampilkan_risiko_churn(dataset, data, path_arrow, versi_data, args.workers),
+        'retensi' : lambda: tampilkan_retensi(data, versi_data),
+        'peta' : lambda: tampilkan_peta(data, versi_data),
+        'addon' : lambda: tampilkan_addon(data, versi_data),
+        'demografi' : lambda: tampilkan_demografi(indeks_filter(cube, versi_data), versi_data, url_img_man, url_img_woman)
+    }
+
+    # Agregat & figur setiap section dihitung bersamaan di thread pool (mengisi cache yang dibaca saat render).
+    # Nilai widget dibaca dari session state karena widget-nya baru dibuat saat section dirender
+    status_demografi = tuple(sorted(st.session_state.get('status_demografi', ['Stayed'])))
+    dimensi_retensi = st.session_state.get('dimensi_retensi', list(DIMENSI_RETENSI)[0])
+    status_addon = st.session_state.get('status_addon')
+    hitung = {
+        'kualitas' : lambda: laporan_kualitas(args.data, versi_data, data, args.chunksize),
+        'status' : lambda: perhitungan_customer_status(cube, versi_data),
+        'alasan' : lambda: perhitungan_churn_reason(cube, versi_data),
+        'revenue' : lambda: hitung_revenue_per_status(cube, versi_data),
+        'demografi' : lambda: figur_demografi(indeks_filter(cube, versi_data), versi_data, status_demografi)
+    }
+    if data is not None:
+        hitung['simulasi'] = lambda: prekomputasi_simulasi(data, versi_data)
+        hitung['risiko'] = lambda: hitung_segmen_risiko(
+            data, skor_risiko(data, path_arrow, str(dataset['path_data']), versi_data, args.workers), versi_data
+        )
+        hitung['retensi'] = lambda: hitung_retensi(matriks_retensi(data, versi_data), versi_data, dimensi_retensi)
+        hitung['peta'] = lambda: bin_peta(data, versi_data)
+        hitung['addon'] = lambda: perhitungan_lift_addon(
+            data, versi_data, tuple(sorted(bitset_addon(data, versi_data)['status'] if status_addon is None else status_addon))
+        )
+
+    # Tugas run sebelumnya dari session ini (mis. sebelum multiselect status diganti) dibatalkan
+    penjadwal = penjadwal_bagian()
+    tugas = penjadwal.jadwalkan(hitung, st.session_state.get('tugas_bagian'))
+    st.session_state['tugas_bagian'] = tugas
+
+    # Section tanpa agregat berat langsung dirender, sisanya segera setelah hasilnya siap
+    for nama in [x for x in judul_bagian if x not in hitung]:
+        with slot[nama].container():
+            tampil[nama]()
+    for nama in penjadwal.selesai(tugas):
+        with slot[nama].container():
+            tampil[nama]()
+
+    if debug:
+        tampilkan_instrumentasi(args.metrics_file)
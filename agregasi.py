@@ -0,0 +1,277 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from pemuat_data import UKURAN_CHUNK, feather, lipat_csv, map_partisi_arrow
+from sketsa import PRESISI_HLL, estimasi_hll, gabung_sketsa, hash_customer, presisi_sketsa, sketsa_per_grup
+
+# Seluruh nilai customer_status pada dataset
+SEMUA_STATUS = ('Churned', 'Joined', 'Stayed')
+
+# Dimensi cube agregat yang dipakai oleh seluruh section dashboard
+DIMENSI_CUBE = [
+    'customer_status',
+    'gender',
+    'married',
+    'contract',
+    'internet_type',
+    'churn_category',
+    'churn_reason',
+    'kelompok_umur'
+]
+
+# Ukuran yang dijumlahkan per sel cube
+UKURAN_CUBE = ['total_customer', 'total_revenue']
+
+# Sketsa HyperLogLog customer_id per sel cube (hanya ada pada mode hitung 'hll')
+KOLOM_SKETSA = 'sketsa_customer'
+
+# Backend penghitung customer: 'exact' menghitung baris (customer_id harus unik),
+# 'hll' memakai sketsa yang bisa digabung, 'auto' memilih exact bila keunikan terverifikasi
+MODE_HITUNG = ['auto', 'exact', 'hll']
+
+# Kolom data mentah yang dibutuhkan untuk membangun cube
+KOLOM_CUBE = DIMENSI_CUBE[:-1] + ['customer_id', 'age', 'total_revenue']
+
+LEBAR_KELOMPOK_UMUR = 10
+
+def kelompok_umur(age):
+    # Bucket umur per 10 tahun, disimpan sebagai batas bawah (mis. 37 -> 30)
+    return ((age // LEBAR_KELOMPOK_UMUR) * LEBAR_KELOMPOK_UMUR).astype('int8')
+
+def presisi_hitung(mode_hitung, customer_unik, presisi_hll = PRESISI_HLL):
+    # Presisi HLL yang dipakai, atau None untuk jalur exact.
+    # customer_unik None berarti keunikan tidak bisa diverifikasi (mis. data streaming)
+    if mode_hitung not in MODE_HITUNG:
+        raise ValueError(f'mode hitung tidak dikenal: {mode_hitung}')
+
+    if mode_hitung == 'exact':
+        if customer_unik is False:
+            raise ValueError('customer_id tidak unik, cube tidak bisa menghitung customer per baris')
+        return (None)
+
+    if mode_hitung == 'hll' or not customer_unik:
+        return (presisi_hll)
+
+    return (None)
+
+def presisi_cube(cube):
+    # Presisi sketsa HLL pada cube, None jika cube memakai hitungan exact
+    if KOLOM_SKETSA not in cube or len(cube) == 0:
+        return (None)
+    return (presisi_sketsa(cube[KOLOM_SKETSA].iloc[0]))
+
+def _agregasi_cube(data, presisi_hll = None):
+    grup = data.groupby(
+        [data[x] for x in DIMENSI_CUBE[:-1]] + [kelompok_umur(data['age']).rename('kelompok_umur')],
+        observed = True,
+        dropna = False
+    )
+    cube = grup.agg(
+        total_customer = ('customer_id', 'size'),
+        total_revenue = ('total_revenue', 'sum')
+    ).reset_index()
+
+    if presisi_hll is not None:
+        register = sketsa_per_grup(grup.ngroup().to_numpy(), len(cube), hash_customer(data['customer_id']), presisi_hll)
+        cube[KOLOM_SKETSA] = list(register)
+
+    return (cube)
+
+def buat_cube(data, mode_hitung = 'auto', presisi_hll = PRESISI_HLL):
+    # Jalur exact: customer_id unik per baris, sehingga jumlah baris per sel == jumlah customer unik
+    presisi_hll = presisi_hitung(mode_hitung, data['customer_id'].is_unique, presisi_hll)
+
+    return (_agregasi_cube(data, presisi_hll))
+
+def _gabung_per_grup(cube, by, dropna):
+    # Ukuran dijumlahkan per grup; sketsa HLL (jika ada) digabung dengan maksimum register
+    grup = cube.groupby(by, observed = True, dropna = dropna, sort = False)
+    hasil = grup[UKURAN_CUBE].sum().reset_index()
+
+    if KOLOM_SKETSA in cube:
+        # Baris dengan kunci NaN (dropna) tidak punya nomor grup
+        kode = grup.ngroup()
+        valid = kode.notna().to_numpy() & (kode.fillna(-1).to_numpy() >= 0)
+        kode = kode.fillna(-1).to_numpy(dtype = np.int64)
+        register = np.stack(cube[KOLOM_SKETSA].to_numpy()[valid]) if valid.any() else np.zeros((0, 1), dtype = np.uint8)
+        hasil[KOLOM_SKETSA] = list(gabung_sketsa(kode[valid], len(hasil), register))
+
+    return (hasil)
+
+def gabung_cube(daftar_cube):
+    # Cube bersifat additive: gabungan beberapa cube parsial == cube dari gabungan datanya
+    cube = _gabung_per_grup(pd.concat(daftar_cube, ignore_index = True), DIMENSI_CUBE, dropna = False)
+
+    # Sel yang customernya habis dibuang dari cube
+    return (cube[cube['total_customer'] != 0].reset_index(drop = True))
+
+def ubah_cube(cube, baris_lama, baris_baru):
+    # Update inkremental: kurangi kontribusi baris lama, tambah kontribusi baris baru
+    if KOLOM_SKETSA in cube:
+        raise ValueError('sketsa HLL tidak bisa dikurangi, cube harus dibangun ulang')
+
+    kontribusi_lama = _agregasi_cube(baris_lama)
+    kontribusi_lama[UKURAN_CUBE] = -kontribusi_lama[UKURAN_CUBE]
+
+    return (gabung_cube([cube, kontribusi_lama, _agregasi_cube(baris_baru)]))
+
+def buat_cube_paralel(data, path_arrow, jumlah_proses, mode_hitung = 'auto', presisi_hll = PRESISI_HLL):
+    # Data dipartisi per rentang baris, cube parsial dihitung di process pool lalu digabung
+    if jumlah_proses <= 1 or path_arrow is None or feather is None:
+        return (buat_cube(data, mode_hitung, presisi_hll))
+
+    presisi_hll = presisi_hitung(mode_hitung, data['customer_id'].is_unique, presisi_hll)
+
+    return (gabung_cube(map_partisi_arrow(_agregasi_cube, path_arrow, len(data), jumlah_proses, KOLOM_CUBE, presisi_hll)))
+
+def _lipat_cube(cube, chunk, presisi_hll):
+    parsial = _agregasi_cube(chunk, presisi_hll)
+    return (parsial if cube is None else gabung_cube([cube, parsial]))
+
+def baca_cube_streaming(path_data, ukuran_chunk = UKURAN_CHUNK, mode_hitung = 'auto', presisi_hll = PRESISI_HLL):
+    # Cube dibangun langsung dari csv per chunk tanpa pernah memegang frame penuh.
+    # Keunikan customer_id tidak bisa dicek lintas chunk, sehingga mode 'auto' memakai sketsa HLL
+    presisi_hll = presisi_hitung(mode_hitung, None, presisi_hll)
+    lipat = partial(_lipat_cube, presisi_hll = presisi_hll)
+
+    cube, versi = lipat_csv(path_data, lipat, None, kolom = KOLOM_CUBE, ukuran_chunk = ukuran_chunk)
+    return (cube, versi)
+
+def slice_cube(cube, by, filter_dimensi = None, dropna = True):
+    # Filter sel cube per dimensi (nilai tunggal atau list), lalu jumlahkan ukurannya per `by`;
+    # None/NaN di filter memilih sel dengan dimensi kosong
+    mask = pd.Series(True, index = cube.index)
+    for dimensi, nilai in (filter_dimensi or {}).items():
+        nilai = nilai if isinstance(nilai, (list, tuple, set)) else [nilai]
+        kosong = any(pd.isna(x) for x in nilai)
+        mask &= cube[dimensi].isin([x for x in nilai if not pd.isna(x)]) | (cube[dimensi].isna() & kosong)
+
+    hasil = _gabung_per_grup(cube.loc[mask], by, dropna)
+
+    # Mode HLL: jumlah customer per grup adalah estimasi dari sketsa gabungan
+    if KOLOM_SKETSA in hasil:
+        register = np.stack(hasil.pop(KOLOM_SKETSA).to_numpy()) if len(hasil) else np.zeros((0, 1), dtype = np.uint8)
+        hasil['total_customer'] = np.round(estimasi_hll(register)).astype('int64')
+
+    return (hasil.sort_values(by, ignore_index = True))
+
+def ke_records(hasil):
+    # Hasil slice -> list dict berisi tipe python (NaN -> None), siap di-serialisasi ke json
+    return (hasil.astype(object).where(hasil.notna(), None).to_dict(orient = 'records'))
+
+# Dimensi filter yang diindeks dengan bitmap posisi baris cube
+DIMENSI_INDEKS = ['customer_status', 'gender']
+
+# Dimensi yang dihitung ulang setiap kali filter demografi berubah
+DIMENSI_DEMOGRAFI = ['kelompok_umur', 'married', 'contract', 'internet_type']
+
+def buat_indeks_filter(cube):
+    # Bitmap (array boolean) posisi baris cube per nilai status & gender,
+    # plus kode integer dimensi demografi agar agregasi cukup dengan np.bincount
+    indeks = {
+        'bitmap' : {},
+        'kode' : {},
+        'label' : {},
+        'total_customer' : cube['total_customer'].to_numpy(dtype = 'float64')
+    }
+
+    for dimensi in DIMENSI_INDEKS:
+        kolom = cube[dimensi].to_numpy()
+        indeks['bitmap'][dimensi] = {nilai : kolom == nilai for nilai in cube[dimensi].dropna().unique()}
+
+    for dimensi in DIMENSI_DEMOGRAFI:
+        kode, label = pd.factorize(cube[dimensi], sort = True, use_na_sentinel = False)
+        indeks['kode'][dimensi] = kode
+        indeks['label'][dimensi] = pd.Index(np.asarray(label, dtype = object))
+
+    if KOLOM_SKETSA in cube:
+        indeks['sketsa'] = np.stack(cube[KOLOM_SKETSA].to_numpy())
+
+    return (indeks)
+
+def _hitung_per_kode(indeks, kode, jumlah_label, terpilih):
+    # Exact: jumlah customer sel terpilih lewat weighted bincount; HLL: gabungan sketsa sel terpilih
+    if 'sketsa' not in indeks:
+        bobot = np.where(terpilih, indeks['total_customer'], 0)
+        return (np.bincount(kode, weights = bobot, minlength = jumlah_label).astype('int64'))
+
+    register = gabung_sketsa(kode[terpilih], jumlah_label, indeks['sketsa'][terpilih])
+    return (np.round(estimasi_hll(register)).astype('int64'))
+
+def agregat_demografi(indeks, status):
+    # Kombinasi filter dijawab dengan irisan bitmap; tidak ada frame yang di-copy
+    bitmap_status = indeks['bitmap']['customer_status']
+    mask_status = np.zeros(len(indeks['total_customer']), dtype = bool)
+    for nilai in status:
+        if nilai in bitmap_status:
+            mask_status |= bitmap_status[nilai]
+
+    label = indeks['label']
+    jumlah_internet = len(label['internet_type'])
+    kode_contract_internet = indeks['kode']['contract'] * jumlah_internet + indeks['kode']['internet_type']
+    kode_total = np.zeros(len(mask_status), dtype = np.int64)
+
+    hasil = {}
+    for gender, bitmap_gender in indeks['bitmap']['gender'].items():
+        terpilih = mask_status & bitmap_gender
+
+        hasil[gender] = {
+            'total' : int(_hitung_per_kode(indeks, kode_total, 1, terpilih)[0]),
+            'kelompok_umur' : pd.Series(
+                _hitung_per_kode(indeks, indeks['kode']['kelompok_umur'], len(label['kelompok_umur']), terpilih),
+                index = label['kelompok_umur']
+            ),
+            'married' : pd.Series(
+                _hitung_per_kode(indeks, indeks['kode']['married'], len(label['married']), terpilih),
+                index = label['married']
+            ),
+            'contract_internet' : pd.DataFrame({
+                'contract' : np.repeat(label['contract'], jumlah_internet),
+                'internet_type' : np.tile(label['internet_type'], len(label['contract'])),
+                'total_customer' : _hitung_per_kode(indeks, kode_contract_internet, len(label['contract']) * jumlah_internet, terpilih)
+            })
+        }
+
+    return (hasil)
+
+# Indeks baris untuk tabel data (sort & filter di server, hanya jendela baris yang dikirim)
+def kunci_urutan(nilai, ascending = True):
+    # Kunci float per baris dengan urutan yang sama dengan sort_values kolom; NaN selalu di akhir
+    if isinstance(nilai.dtype, pd.CategoricalDtype):
+        kode = nilai.cat.codes.to_numpy()
+    elif pd.api.types.is_numeric_dtype(nilai.dtype) or pd.api.types.is_datetime64_any_dtype(nilai.dtype):
+        kode = None
+    else:
+        kode, _ = pd.factorize(nilai, sort = True)
+
+    if kode is None:
+        kunci = nilai.to_numpy(dtype = 'float64', na_value = np.nan)
+    else:
+        kunci = np.where(kode < 0, np.nan, kode.astype('float64'))
+
+    kunci = kunci if ascending else -kunci
+    return (np.where(np.isnan(kunci), np.inf, kunci))
+
+def halaman_urutan(data, kolom, ascending, posisi, awal, jumlah):
+    # Posisi baris pada jendela [awal, awal + jumlah) dari `posisi` (urut naik) setelah diurutkan stabil
+    # berdasarkan kolom. Tanpa permutasi penuh: argpartition memilih baris sampai akhir jendela,
+    # hanya baris tersebut yang diurutkan
+    akhir = min(awal + jumlah, len(posisi))
+    if kolom is None or awal >= akhir:
+        return (posisi[awal:akhir])
+
+    kunci = kunci_urutan(data[kolom], ascending)[posisi]
+    batas = kunci[np.argpartition(kunci, akhir - 1)[akhir - 1]]
+
+    # Nilai sama dengan batas diambil sesuai urutan posisi agar hasilnya stabil
+    kurang = np.flatnonzero(kunci < batas)
+    pilih = np.concatenate([kurang, np.flatnonzero(kunci == batas)[:akhir - len(kurang)]])
+    pilih = pilih[np.lexsort((pilih, kunci[pilih]))]
+
+    return (posisi[pilih[awal:akhir]])
+
+def posisi_per_nilai(data, kolom):
+    # Posisi baris per nilai kolom kategori
+    return (data.groupby(kolom, observed = True, sort = False).indices)
@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from pemuat_data import PATH_DATA
+from ingesti import FOLDER_DELTA, muat_dataset, sinkron_delta
+from agregasi import ke_records, slice_cube
+
+LOGGER = logging.getLogger('telco.api')
+
+# Parameter query yang boleh dipakai sebagai filter (nilai dipisah koma atau parameter berulang);
+# token TOKEN_KOSONG memilih nilai kosong (mis. internet_type customer tanpa layanan internet)
+TOKEN_KOSONG = 'None'
+FILTER_API = {
+    'status' : 'customer_status',
+    'gender' : 'gender',
+    'contract' : 'contract',
+    'internet_type' : 'internet_type'
+}
+MAKS_RESPON_CACHE = 256
+
+def _status(cube, filter_dimensi):
+    return (ke_records(slice_cube(cube, ['customer_status'], filter_dimensi)[['customer_status', 'total_customer']]))
+
+def _churn_reason(cube, filter_dimensi):
+    hasil = slice_cube(cube, ['churn_category', 'churn_reason'], filter_dimensi)
+    return (ke_records(hasil[['churn_category', 'churn_reason', 'total_customer']]))
+
+def _revenue(cube, filter_dimensi):
+    return (ke_records(slice_cube(cube, ['customer_status'], filter_dimensi)[['customer_status', 'total_revenue']]))
+
+def _demografi(cube, filter_dimensi):
+    umur = slice_cube(cube, ['gender', 'kelompok_umur'], filter_dimensi)
+    umur['kelompok_umur'] = [f'{x}-{x + 9}' for x in umur['kelompok_umur']]
+
+    return ({
+        'total' : ke_records(slice_cube(cube, ['gender'], filter_dimensi)[['gender', 'total_customer']]),
+        'kelompok_umur' : ke_records(umur[['gender', 'kelompok_umur', 'total_customer']]),
+        'married' : ke_records(slice_cube(cube, ['gender', 'married'], filter_dimensi)[['gender', 'married', 'total_customer']]),
+        'contract_internet' : ke_records(
+            slice_cube(cube, ['gender', 'contract', 'internet_type'], filter_dimensi, dropna = False)[['gender', 'contract', 'internet_type', 'total_customer']]
+        )
+    })
+
+# Endpoint -> fungsi agregat dari cube (data baris tidak pernah disentuh)
+ENDPOINT = {
+    '/status' : _status,
+    '/churn-reasons' : _churn_reason,
+    '/revenue' : _revenue,
+    '/demographics' : _demografi
+}
+
+class PenyimpanRespon:
+    # Cache LRU body json + ETag, dikunci versi dataset sehingga versi baru tidak memakai respon lama
+    def __init__(self, dataset, maks = MAKS_RESPON_CACHE):
+        self.dataset = dataset
+        self.maks = maks
+        self.respon = OrderedDict()
+        self.kunci = threading.Lock()
+        self.kunci_dataset = dataset.setdefault('kunci', threading.Lock())
+
+    def terkini(self):
+        # Delta harian baru diterapkan dengan kunci yang sama dengan dashboard (jika berjalan bersama)
+        with self.kunci_dataset:
+            if self.dataset['data'] is not None:
+                sinkron_delta(self.dataset)
+            return (self.dataset['cube'], self.dataset['versi'])
+
+    def ambil(self, path, filter_dimensi):
+        cube, versi = self.terkini()
+        kunci = (versi, path, json.dumps(filter_dimensi, sort_keys = True))
+
+        with self.kunci:
+            if kunci in self.respon:
+                self.respon.move_to_end(kunci)
+                return (self.respon[kunci])
+
+        body = json.dumps({'versi' : versi, 'filter' : filter_dimensi, 'hasil' : ENDPOINT[path](cube, filter_dimensi)}).encode()
+        # ETag kuat: isi respon ditentukan sepenuhnya oleh versi dataset, endpoint & filter
+        etag = '"' + hashlib.sha256('\0'.join(kunci).encode()).hexdigest()[:32] + '"'
+
+        with self.kunci:
+            self.respon[kunci] = (etag, body)
+            while len(self.respon) > self.maks:
+                self.respon.popitem(last = False)
+
+        return ((etag, body))
+
+def baca_filter(query):
+    filter_dimensi = {}
+    for nama, nilai in parse_qs(query).items():
+        if nama not in FILTER_API:
+            raise ValueError(f'unknown filter: {nama}')
+        nilai = {y.strip() for x in nilai for y in x.split(',') if y.strip()}
+        filter_dimensi[FILTER_API[nama]] = sorted((None if x == TOKEN_KOSONG else x for x in nilai), key = lambda x: (x is None, x or ''))
+
+    return (filter_dimensi)
+
+def cocok_etag(etag, if_none_match):
+    # Perbandingan lemah RFC 7232 3.2 untuk If-None-Match: prefix W/ diabaikan (proxy/CDN melemahkan
+    # ETag setelah kompresi), '*' cocok dengan representasi apa pun
+    if not if_none_match:
+        return (False)
+
+    daftar = [x.strip() for x in if_none_match.split(',')]
+    return ('*' in daftar or etag.removeprefix('W/') in [x.removeprefix('W/') for x in daftar])
+
+def buat_handler(penyimpan):
+    class HandlerAgregat(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path not in ENDPOINT:
+                return (self._kirim(404, {'error' : 'not found', 'endpoint' : sorted(ENDPOINT)}))
+
+            try:
+                filter_dimensi = baca_filter(url.query)
+            except ValueError as e:
+                return (self._kirim(400, {'error' : str(e)}))
+
+            etag, body = penyimpan.ambil(url.path, filter_dimensi)
+            if cocok_etag(etag, self.headers.get('If-None-Match')):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            # Header (termasuk ETag & 304) sama dengan GET, tanpa body
+            self.do_GET()
+
+        def _kirim(self, kode, isi):
+            body = json.dumps(isi).encode()
+            self.send_response(kode)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            LOGGER.info(format, *args)
+
+    return (HandlerAgregat)
+
+def buat_server(dataset, host = '127.0.0.1', port = 8600):
+    return (ThreadingHTTPServer((host, port), buat_handler(PenyimpanRespon(dataset))))
+
+def jalankan_di_latar(dataset, host = '127.0.0.1', port = 8600):
+    # Server berjalan di thread daemon di samping app streamlit, memakai dataset yang sama
+    server = buat_server(dataset, host, port)
+    threading.Thread(target = server.serve_forever, name = 'api-agregat', daemon = True).start()
+
+    return (server)
+
+def main():
+    parser = argparse.ArgumentParser(description = 'API json agregat dashboard churn')
+    parser.add_argument('--data', default = str(PATH_DATA))
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8600)
+    args = parser.parse_args()
+
+    logging.basicConfig(level = logging.INFO)
+    server = buat_server(muat_dataset(args.data, FOLDER_DELTA), args.host, args.port)
+    print(f'serving aggregates on http://{args.host}:{server.server_port}')
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
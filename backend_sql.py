@@ -0,0 +1,106 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from pemuat_data import FOLDER_CACHE, PATH_KAMUS_DATA, UKURAN_CHUNK, adalah_url, frame_kosong, hash_file, lipat_csv, tulis_atomic
+from agregasi import DIMENSI_CUBE, KOLOM_CUBE, LEBAR_KELOMPOK_UMUR, presisi_hitung
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Backend penyimpanan: 'pandas' (frame di memori proses) atau database tertanam di .cache/
+BACKEND = ['pandas', 'sqlite', 'duckdb']
+EKSTENSI_DB = {
+    'sqlite' : 'sqlite',
+    'duckdb' : 'duckdb'
+}
+NAMA_TABEL = 'churn'
+
+def path_db(path_data, versi, backend):
+    return (FOLDER_CACHE / f'{Path(path_data).stem}-{versi}.{EKSTENSI_DB[backend]}')
+
+def hubungkan(path, backend, tulis = False):
+    # Koneksi baca saja: banyak proses/worker app bisa memakai satu file database yang sama
+    if backend == 'duckdb':
+        if duckdb is None:
+            raise ImportError('backend duckdb membutuhkan paket duckdb (pip install duckdb)')
+        return (duckdb.connect(str(path), read_only = not tulis))
+
+    if tulis:
+        return (sqlite3.connect(path))
+    return (sqlite3.connect(f'file:{path}?mode=ro', uri = True, check_same_thread = False))
+
+def _tulis_chunk(koneksi, chunk, backend):
+    if backend == 'duckdb':
+        koneksi.register('chunk', chunk)
+        if NAMA_TABEL in {x[0] for x in koneksi.execute('SHOW TABLES').fetchall()}:
+            koneksi.execute(f'INSERT INTO {NAMA_TABEL} SELECT * FROM chunk')
+        else:
+            koneksi.execute(f'CREATE TABLE {NAMA_TABEL} AS SELECT * FROM chunk')
+        koneksi.unregister('chunk')
+    else:
+        chunk.to_sql(NAMA_TABEL, koneksi, if_exists = 'append', index = False)
+
+    return (koneksi)
+
+def muat_db(path_data, backend = 'sqlite', ukuran_chunk = UKURAN_CHUNK, path_kamus = PATH_KAMUS_DATA):
+    # Csv dimuat ke file database sekali per versi (per chunk, memori tetap kecil), lalu dipakai bersama
+    if adalah_url(path_data):
+        raise ValueError('backend SQL membutuhkan file data lokal')
+
+    versi = hash_file(path_data, path_kamus)
+    path = path_db(path_data, versi, backend)
+    if path.exists():
+        return (path, versi)
+
+    def tulis(path_tmp):
+        koneksi = hubungkan(path_tmp, backend, tulis = True)
+        try:
+            lipat_csv(path_data, lambda koneksi, chunk: _tulis_chunk(koneksi, chunk, backend), koneksi, ukuran_chunk = ukuran_chunk, path_kamus = path_kamus)
+            koneksi.commit()
+        finally:
+            koneksi.close()
+
+    tulis_atomic(path, tulis, f'{Path(path_data).stem}-*.{EKSTENSI_DB[backend]}')
+
+    return (path, versi)
+
+def query(koneksi, sql):
+    if duckdb is not None and isinstance(koneksi, duckdb.DuckDBPyConnection):
+        return (koneksi.execute(sql).df())
+    return (pd.read_sql_query(sql, koneksi))
+
+def cube_sql(koneksi, path_data, mode_hitung = 'auto', path_kamus = PATH_KAMUS_DATA):
+    # Pushdown: filter kolom & group by dijalankan di database, hanya sel cube yang kembali ke pandas
+    unik = bool(query(koneksi, f'SELECT COUNT(*) = COUNT(DISTINCT customer_id) AS unik FROM {NAMA_TABEL}')['unik'].iloc[0])
+    if presisi_hitung(mode_hitung, unik) is not None:
+        raise ValueError('backend SQL menghitung customer per baris; customer_id harus unik (mode exact)')
+
+    dimensi = ', '.join(DIMENSI_CUBE[:-1])
+    cube = query(koneksi, f"""
+        SELECT {dimensi},
+               age - age % {LEBAR_KELOMPOK_UMUR} AS kelompok_umur,
+               COUNT(*) AS total_customer,
+               SUM(total_revenue) AS total_revenue
+        FROM {NAMA_TABEL}
+        GROUP BY {dimensi}, kelompok_umur
+    """)
+
+    # Dtype disamakan dengan jalur pandas (kategori dari kamus data) agar hasil slice identik
+    dtype = frame_kosong(path_data, path_kamus, KOLOM_CUBE).dtypes
+    for kolom in DIMENSI_CUBE[:-1]:
+        nilai = cube[kolom].astype(object).where(cube[kolom].notna(), None)
+        cube[kolom] = pd.Series(nilai, dtype = dtype[kolom])
+
+    return (cube.astype({'kelompok_umur' : 'int8', 'total_customer' : 'int64', 'total_revenue' : 'float64'}))
+
+def baca_cube_sql(path_data, backend = 'sqlite', mode_hitung = 'auto', ukuran_chunk = UKURAN_CHUNK):
+    path, versi = muat_db(path_data, backend, ukuran_chunk)
+    koneksi = hubungkan(path, backend)
+    try:
+        return (cube_sql(koneksi, path_data, mode_hitung), versi)
+    finally:
+        koneksi.close()
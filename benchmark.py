@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from instrumentasi import mode_bare, rss
+from pemuat_data import FOLDER_APP, FOLDER_CACHE, PATH_DATA, tulis_atomic
+from agregasi import SEMUA_STATUS
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+mode_bare()
+
+FOLDER_BENCHMARK = FOLDER_CACHE / 'benchmark'
+UKURAN_DEFAULT = [100_000, 1_000_000, 10_000_000]
+UKURAN_CHUNK_TULIS = 500_000
+
+def buat_data_sintetis(jumlah_baris, seed = 0, path_sumber = PATH_DATA):
+    # Resampling baris (bootstrap) dari data asli: distribusi marginal, himpunan kategori & relasi
+    # antar kolom (mis. churn reason hanya untuk Churned) tetap sama; Customer ID dibuat unik
+    path = FOLDER_BENCHMARK / f'sintetis-{jumlah_baris}-{seed}.csv'
+    if path.exists():
+        return (path)
+
+    sumber = pd.read_csv(path_sumber, dtype = str, keep_default_na = False)
+    rng = np.random.default_rng(seed)
+
+    def tulis(path_tmp):
+        for awal in range(0, jumlah_baris, UKURAN_CHUNK_TULIS):
+            jumlah = min(UKURAN_CHUNK_TULIS, jumlah_baris - awal)
+            chunk = sumber.iloc[rng.integers(0, len(sumber), jumlah)].copy()
+            chunk['Customer ID'] = [f'S{x:010d}' for x in range(awal, awal + jumlah)]
+            chunk.to_csv(path_tmp, mode = 'w' if awal == 0 else 'a', header = awal == 0, index = False)
+
+    tulis_atomic(path, tulis)
+
+    return (path)
+
+def hapus_snapshot(path_data):
+    # Cold start: snapshot Arrow & hasil ingesti dataset ini dihapus
+    for lama in FOLDER_CACHE.glob(f'{Path(path_data).stem}[-.]*'):
+        lama.unlink(missing_ok = True)
+
+def _reset_rss_puncak():
+    # Linux: menulis 5 ke clear_refs mengembalikan high-water RSS proses ke RSS saat ini
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return (True)
+    except OSError:
+        return (False)
+
+def _rss_puncak():
+    # High-water RSS proses (ru_maxrss dalam KB di Linux, byte di macOS)
+    maks = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (maks if sys.platform == 'darwin' else maks * 1024)
+
+def ukur(fungsi, ulang, persiapan = None):
+    # Waktu = minimum dari beberapa pengulangan; memori puncak (alokasi python/numpy) diukur terpisah
+    # karena tracemalloc memperlambat eksekusi. tracemalloc tidak melihat memory pool pyarrow, jadi
+    # kenaikan high-water RSS di atas RSS awal juga dicatat (di pengulangan terakhir, tanpa tracemalloc)
+    import streamlit as st
+
+    waktu = []
+    rss_puncak = None
+    for i in range(ulang):
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        if persiapan is not None:
+            persiapan()
+        rss_awal = rss() if i == ulang - 1 and resource is not None and _reset_rss_puncak() else None
+        mulai = time.perf_counter()
+        fungsi()
+        waktu.append(time.perf_counter() - mulai)
+        if rss_awal is not None:
+            rss_puncak = max(_rss_puncak() - rss_awal, 0) / 2**20
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    if persiapan is not None:
+        persiapan()
+    tracemalloc.start()
+    fungsi()
+    _, puncak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return ({'detik' : min(waktu), 'detik_semua' : waktu, 'memori_puncak_mb' : puncak / 2**20, 'rss_puncak_mb' : rss_puncak})
+
+def benchmark_ukuran(path_data, ulang, folder_delta):
+    import FinalProjectStreamlit as app
+
+    hasil = {}
+    hasil['ekstrak_data (cold)'] = ukur(lambda: app.ekstrak_data(str(path_data), folder_delta), ulang,
+                                        persiapan = lambda: hapus_snapshot(path_data))
+    hasil['ekstrak_data (warm)'] = ukur(lambda: app.ekstrak_data(str(path_data), folder_delta), ulang)
+
+    dataset = app.ekstrak_data(str(path_data), folder_delta)
+    cube, versi = dataset['cube'], dataset['versi']
+    indeks = app.buat_indeks_filter(cube)
+    agregat = app.agregat_demografi(indeks, SEMUA_STATUS)
+
+    daftar_fungsi = {
+        'perhitungan_customer_status' : lambda: app.perhitungan_customer_status(cube, versi),
+        'perhitungan_churn_reason' : lambda: app.perhitungan_churn_reason(cube, versi),
+        'tampilkan_revenue_impact' : lambda: app.tampilkan_revenue_impact(cube, versi),
+        'indeks_filter' : lambda: app.indeks_filter(cube, versi),
+        'filter_demografi' : lambda: app.filter_demografi(indeks, versi, SEMUA_STATUS),
+        'count_per_gender' : lambda: app.count_per_gender(agregat),
+        'distribusi_umur' : lambda: app.distribusi_umur(agregat, gender = 'Male', color = '#0a75ad'),
+        'married_status' : lambda: app.married_status(agregat, gender = 'Male', color = ('#bfac60', '#0a75ad')),
+        'contract_type' : lambda: app.contract_type(agregat, gender = 'Male')
+    }
+    for nama, fungsi in daftar_fungsi.items():
+        hasil[nama] = ukur(fungsi, ulang)
+
+    return (hasil)
+
+def info_commit():
+    hasil = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd = FOLDER_APP, capture_output = True, text = True)
+    return (hasil.stdout.strip() or None)
+
+def bandingkan(laporan, path_pembanding, rasio_maks = None):
+    # Rasio waktu terhadap hasil benchmark sebelumnya (mis. commit lain), > 1 berarti lebih lambat;
+    # kembalikan daftar section yang rasionya melewati rasio_maks
+    with open(path_pembanding) as f:
+        pembanding = json.load(f)
+
+    pelanggaran = []
+    print(f"\ncompared with {pembanding.get('commit')}")
+    for ukuran, hasil in laporan['hasil'].items():
+        for nama, nilai in hasil.items():
+            lama = pembanding['hasil'].get(ukuran, {}).get(nama)
+            if lama is not None and lama['detik'] > 0:
+                rasio = nilai['detik'] / lama['detik']
+                print(f"{ukuran:>10} {nama:<30}{rasio:>8.2f}x")
+                if rasio_maks is not None and rasio > rasio_maks:
+                    pelanggaran.append(f'{ukuran} rows {nama}: {rasio:.2f}x slower > {rasio_maks:.2f}x')
+
+    return (pelanggaran)
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Benchmark setiap bagian dashboard pada data sintetis')
+    parser.add_argument('--rows', type = int, nargs = '+', default = UKURAN_DEFAULT)
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--output', default = 'benchmark.json')
+    parser.add_argument('--compare', help = 'file json hasil benchmark sebelumnya')
+    parser.add_argument('--max-ratio', type = float, help = 'rasio waktu maksimum terhadap --compare')
+    args = parser.parse_args()
+    if args.max_ratio is not None and not args.compare:
+        parser.error('--max-ratio needs --compare')
+
+    # Folder delta kosong agar delta produksi tidak ikut terukur
+    folder_delta = FOLDER_BENCHMARK / 'delta'
+    folder_delta.mkdir(parents = True, exist_ok = True)
+
+    laporan = {
+        'commit' : info_commit(),
+        'waktu' : datetime.now(timezone.utc).isoformat(),
+        'python' : platform.python_version(),
+        'pandas' : pd.__version__,
+        'numpy' : np.__version__,
+        'platform' : platform.platform(),
+        'cpu' : os.cpu_count(),
+        'hasil' : {}
+    }
+
+    for jumlah_baris in args.rows:
+        path_data = buat_data_sintetis(jumlah_baris, args.seed)
+        hasil = benchmark_ukuran(path_data, args.repeat, folder_delta)
+        laporan['hasil'][str(jumlah_baris)] = hasil
+
+        print(f"\n{jumlah_baris:,} rows")
+        print(f"{'function':<30}{'seconds':>10}{'peak MB':>10}{'RSS MB':>10}")
+        for nama, nilai in hasil.items():
+            rss_mb = 'n/a' if nilai['rss_puncak_mb'] is None else f"{nilai['rss_puncak_mb']:.1f}"
+            print(f"{nama:<30}{nilai['detik']:>10.4f}{nilai['memori_puncak_mb']:>10.1f}{rss_mb:>10}")
+
+    with open(args.output, 'w') as f:
+        json.dump(laporan, f, indent = 2)
+
+    pelanggaran = bandingkan(laporan, args.compare, args.max_ratio) if args.compare else []
+    for x in pelanggaran:
+        print(f'FAIL {x}')
+
+    return (1 if pelanggaran else 0)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import argparse
+import itertools
+import sys
+
+import pandas as pd
+
+from instrumentasi import mode_bare
+from pemuat_data import PATH_DATA, parse_csv
+from agregasi import SEMUA_STATUS, agregat_demografi, buat_cube, buat_indeks_filter
+from backend_sql import BACKEND, baca_cube_sql, duckdb
+
+mode_bare()
+
+# Toleransi relatif untuk jumlah revenue (urutan penjumlahan float di database berbeda); hitungan customer harus identik
+RTOL_REVENUE = 1e-9
+
+def _sama(nama, a, b, hasil):
+    try:
+        if isinstance(a, pd.DataFrame):
+            pd.testing.assert_frame_equal(a.reset_index(drop = True), b.reset_index(drop = True), check_exact = False, rtol = RTOL_REVENUE)
+        elif isinstance(a, pd.Series):
+            pd.testing.assert_series_equal(a, b, check_exact = True)
+        else:
+            assert a == b, f'{a!r} != {b!r}'
+        hasil.append((nama, True, ''))
+    except AssertionError as e:
+        hasil.append((nama, False, str(e).strip().splitlines()[0] if str(e).strip() else ''))
+
+def bandingkan_cube(app, cube_pandas, cube_sql):
+    # Setiap fungsi section dijalankan pada kedua cube (versi cache dibedakan agar tidak saling memakai hasil)
+    hasil = []
+    _sama('hitung_customer_status', app.hitung_customer_status(cube_pandas, 'paritas-pandas'), app.hitung_customer_status(cube_sql, 'paritas-sql'), hasil)
+    _sama('hitung_churn_reason', app.hitung_churn_reason(cube_pandas, 'paritas-pandas'), app.hitung_churn_reason(cube_sql, 'paritas-sql'), hasil)
+    _sama('hitung_revenue_per_status', app.hitung_revenue_per_status(cube_pandas, 'paritas-pandas'), app.hitung_revenue_per_status(cube_sql, 'paritas-sql'), hasil)
+
+    # Figur status & churn reason hanya berisi hitungan customer, JSON-nya harus identik
+    _sama('perhitungan_customer_status (figure)', app.pie_customer_status(app.hitung_customer_status(cube_pandas, 'paritas-pandas')).to_json(),
+          app.pie_customer_status(app.hitung_customer_status(cube_sql, 'paritas-sql')).to_json(), hasil)
+    _sama('perhitungan_churn_reason (figure)', app.bar_churn_reason(app.hitung_churn_reason(cube_pandas, 'paritas-pandas')).to_json(),
+          app.bar_churn_reason(app.hitung_churn_reason(cube_sql, 'paritas-sql')).to_json(), hasil)
+
+    indeks_pandas, indeks_sql = buat_indeks_filter(cube_pandas), buat_indeks_filter(cube_sql)
+    for jumlah in range(1, len(SEMUA_STATUS) + 1):
+        for status in itertools.combinations(SEMUA_STATUS, jumlah):
+            a, b = agregat_demografi(indeks_pandas, status), agregat_demografi(indeks_sql, status)
+            label = '+'.join(status)
+            _sama(f'count_per_gender [{label}]', app.count_per_gender(a), app.count_per_gender(b), hasil)
+            for gender in ['Male', 'Female']:
+                _sama(f'distribusi_umur [{label}, {gender}]', app.distribusi_umur(a, gender, '#000000').to_json(), app.distribusi_umur(b, gender, '#000000').to_json(), hasil)
+                _sama(f'married_status [{label}, {gender}]', app.married_status(a, gender, ('#000000', '#ffffff')).to_json(),
+                      app.married_status(b, gender, ('#000000', '#ffffff')).to_json(), hasil)
+                _sama(f'contract_type [{label}, {gender}]', app.contract_type(a, gender).to_json(), app.contract_type(b, gender).to_json(), hasil)
+
+    return (hasil)
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Cek paritas hasil section antara jalur pandas & backend SQL')
+    parser.add_argument('--data', default = str(PATH_DATA))
+    parser.add_argument('--backend', nargs = '+', choices = BACKEND[1:], default = ['sqlite'] + (['duckdb'] if duckdb is not None else []))
+    args = parser.parse_args()
+
+    import FinalProjectStreamlit as app
+
+    cube_pandas = buat_cube(parse_csv(args.data), 'exact')
+
+    gagal = 0
+    for backend in args.backend:
+        cube_sql, _ = baca_cube_sql(args.data, backend, 'exact')
+        hasil = bandingkan_cube(app, cube_pandas, cube_sql)
+        gagal += sum(not x[1] for x in hasil)
+
+        print(f'\n{backend}: {sum(x[1] for x in hasil)}/{len(hasil)} checks identical')
+        for nama, ok, pesan in hasil:
+            if not ok:
+                print(f'  FAIL {nama}: {pesan}')
+
+    return (1 if gagal else 0)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from agregasi import KOLOM_SKETSA, buat_cube, buat_cube_paralel, ubah_cube
+from pemuat_data import FOLDER_APP, FOLDER_CACHE, PATH_DATA, PATH_KAMUS_DATA, adalah_url, baca_data, feather, hash_file, parse_csv, path_snapshot, tulis_atomic
+from sketsa import PRESISI_HLL
+
+# File delta harian (format kolom sama dengan telecom_customer_churn.csv), diterapkan urut nama file
+FOLDER_DELTA = FOLDER_APP / 'delta'
+
+# Snapshot delta dipadatkan menjadi satu snapshot penuh jika jumlahnya > BATAS_DELTA
+# atau total barisnya > RASIO_DELTA x jumlah baris dataset
+BATAS_DELTA = 8
+RASIO_DELTA = 0.1
+
+LOGGER = logging.getLogger('telco.ingesti')
+
+def daftar_delta(folder_delta = FOLDER_DELTA):
+    return (sorted(Path(folder_delta).glob('*.csv')))
+
+def versi_setelah_delta(versi, versi_delta):
+    # Versi baru diturunkan dari versi sebelumnya + isi delta, sehingga cache ter-invalidasi tepat
+    return (hashlib.sha256(f'{versi}:{versi_delta}'.encode()).hexdigest()[:16])
+
+def upsert_delta(data, delta):
+    # Customer yang sudah ada diganti barisnya, customer baru ditambahkan
+    delta = delta.drop_duplicates(subset = ['customer_id'], keep = 'last')
+    delta = delta.astype(data.dtypes[delta.columns].to_dict())
+    sudah_ada = data['customer_id'].isin(delta['customer_id'])
+
+    baris_lama = data.loc[sudah_ada]
+    data = pd.concat([data.loc[~sudah_ada], delta], ignore_index = True)
+
+    return (data, baris_lama, delta)
+
+def terapkan_delta(dataset, path_delta, path_kamus = PATH_KAMUS_DATA):
+    # Delta diparsing dengan skema yang sama dengan data dasar agar dtype kategori identik
+    delta = parse_csv(path_delta, path_kamus)
+
+    data, baris_lama, baris_baru = upsert_delta(dataset['data'], delta)
+
+    dataset['data'] = data
+    if KOLOM_SKETSA in dataset['cube']:
+        # Sketsa HLL tidak bisa dikurangi, cube dibangun ulang dari frame hasil upsert
+        dataset['cube'] = buat_cube(data, dataset['mode_hitung'], dataset['presisi_hll'])
+    else:
+        dataset['cube'] = ubah_cube(dataset['cube'], baris_lama, baris_baru)
+    dataset['versi'] = versi_setelah_delta(dataset['versi'], hash_file(path_delta))
+    dataset['delta'].append(Path(path_delta).name)
+
+    return (baris_baru)
+
+def _path_manifest(path_data):
+    return (FOLDER_CACHE / f'{Path(path_data).stem}.ingesti.json')
+
+def _path_snapshot_ingesti(path_data, versi):
+    return (FOLDER_CACHE / f'{Path(path_data).stem}.ingesti-{versi}.arrow')
+
+def _path_snapshot_delta(path_data, versi):
+    return (FOLDER_CACHE / f'{Path(path_data).stem}.ingesti-delta-{versi}.arrow')
+
+def _path_snapshot_padat(dataset):
+    # Snapshot penuh terakhir: data dasar jika belum pernah dipadatkan
+    if dataset['versi_padat'] == dataset['versi_dasar']:
+        return (path_snapshot(dataset['path_data'], dataset['versi_dasar']))
+    return (_path_snapshot_ingesti(dataset['path_data'], dataset['versi_padat']))
+
+def _tulis_feather(data, path):
+    tulis_atomic(path, lambda x: feather.write_feather(data.reset_index(drop = True), x, compression = 'uncompressed'))
+
+def _perlu_dipadatkan(dataset):
+    baris_delta = sum(dataset['baris_delta'])
+    return (len(dataset['snapshot_delta']) > BATAS_DELTA or baris_delta > RASIO_DELTA * max(len(dataset['data']), 1))
+
+def simpan_dataset(dataset, baris_baru = ()):
+    # Baris hasil parsing setiap delta disimpan sebagai snapshot Arrow kecil (append-only); frame penuh
+    # hanya ditulis ulang (dipadatkan) jika delta yang tertumpuk melewati batas
+    if feather is None or adalah_url(dataset['path_data']):
+        return
+
+    path_data = dataset['path_data']
+    for versi, baris in baris_baru:
+        _tulis_feather(baris, _path_snapshot_delta(path_data, versi))
+        dataset['snapshot_delta'].append(versi)
+        dataset['baris_delta'].append(len(baris))
+
+    if _perlu_dipadatkan(dataset) or not _path_snapshot_padat(dataset).exists():
+        _tulis_feather(dataset['data'], _path_snapshot_ingesti(path_data, dataset['versi']))
+        dataset['versi_padat'] = dataset['versi']
+        dataset['snapshot_delta'], dataset['baris_delta'] = [], []
+
+    manifest = {
+        'versi_dasar' : dataset['versi_dasar'],
+        'versi' : dataset['versi'],
+        'delta' : dataset['delta'],
+        'versi_padat' : dataset['versi_padat'],
+        'snapshot_delta' : dataset['snapshot_delta'],
+        'baris_delta' : dataset['baris_delta']
+    }
+    tulis_atomic(_path_manifest(path_data), lambda x: x.write_text(json.dumps(manifest, indent = 2)))
+
+    # Snapshot yang tidak lagi tercatat di manifest dihapus (setelah manifest baru ditulis)
+    dipakai = {_path_snapshot_padat(dataset)} | {_path_snapshot_delta(path_data, x) for x in dataset['snapshot_delta']}
+    for lama in FOLDER_CACHE.glob(f'{Path(path_data).stem}.ingesti-*.arrow'):
+        if lama not in dipakai:
+            lama.unlink(missing_ok = True)
+
+def snapshot_dataset(dataset):
+    # Snapshot Arrow dengan isi & urutan baris yang sama dengan frame dataset saat ini (untuk worker paralel).
+    # Selama ada delta yang belum dipadatkan tidak ada snapshot yang cocok, worker kembali ke perhitungan di proses ini
+    if feather is None or adalah_url(dataset['path_data']) or dataset['snapshot_delta']:
+        return (None)
+
+    snapshot = _path_snapshot_padat(dataset)
+    return (snapshot if snapshot.exists() else None)
+
+def _muat_ulang(dataset):
+    # Kembali ke data dasar; semua delta diterapkan lagi dari awal sesuai urutan nama file
+    data, versi = baca_data(dataset['path_data'])
+    dataset.update({
+        'data' : data,
+        'cube' : buat_cube(data, dataset['mode_hitung'], dataset['presisi_hll']),
+        'versi_dasar' : versi,
+        'versi' : versi,
+        'delta' : [],
+        'versi_padat' : versi,
+        'snapshot_delta' : [],
+        'baris_delta' : []
+    })
+
+def sinkron_delta(dataset):
+    # Terapkan delta yang belum pernah diterapkan; kembalikan jumlah delta baru
+    delta_baru = [x for x in daftar_delta(dataset['folder_delta']) if x.name not in dataset['delta']]
+
+    # Delta yang datang terlambat (nama file lebih awal dari delta terakhir yang sudah diterapkan) akan
+    # mengubah urutan upsert, sehingga dataset dibangun ulang dari data dasar dengan urutan nama file
+    if delta_baru and dataset['delta'] and delta_baru[0].name < dataset['delta'][-1]:
+        LOGGER.warning('delta %s arrived after %s was applied; rebuilding from the base data in filename order',
+                       ', '.join(x.name for x in delta_baru if x.name < dataset['delta'][-1]), dataset['delta'][-1])
+        _muat_ulang(dataset)
+        delta_baru = daftar_delta(dataset['folder_delta'])
+
+    baris_baru = []
+    for path_delta in delta_baru:
+        baris = terapkan_delta(dataset, path_delta)
+        baris_baru.append((dataset['versi'], baris))
+
+    if delta_baru:
+        simpan_dataset(dataset, baris_baru)
+
+    return (len(delta_baru))
+
+def _muat_dataset_tersimpan(path_data, folder_delta):
+    # Dataset hasil ingesti sebelumnya hanya dipakai jika data dasar & delta yang tercatat tidak berubah:
+    # snapshot padat dibaca lalu snapshot delta sesudahnya di-upsert berurutan (tanpa parsing csv delta)
+    path_manifest = _path_manifest(path_data)
+    if feather is None or adalah_url(path_data) or not path_manifest.exists():
+        return (None)
+
+    manifest = json.loads(path_manifest.read_text())
+    if 'versi_padat' not in manifest:
+        return (None)
+    if manifest['versi_padat'] == manifest['versi_dasar']:
+        snapshot = path_snapshot(path_data, manifest['versi_dasar'])
+    else:
+        snapshot = _path_snapshot_ingesti(path_data, manifest['versi_padat'])
+    snapshot_delta = [_path_snapshot_delta(path_data, x) for x in manifest['snapshot_delta']]
+    nama_delta = [x.name for x in daftar_delta(folder_delta)]
+
+    if manifest['versi_dasar'] != hash_file(path_data, PATH_KAMUS_DATA) or not all(x.exists() for x in [snapshot] + snapshot_delta) \
+            or manifest['delta'] != nama_delta[:len(manifest['delta'])]:
+        return (None)
+
+    data = feather.read_table(snapshot, memory_map = True).to_pandas(split_blocks = True, self_destruct = True)
+    for path in snapshot_delta:
+        delta = feather.read_table(path, memory_map = True).to_pandas(split_blocks = True, self_destruct = True)
+        data, _, _ = upsert_delta(data, delta)
+
+    return (data, manifest, None if snapshot_delta else snapshot)
+
+def muat_dataset(path_data = PATH_DATA, folder_delta = FOLDER_DELTA, jumlah_proses = 1, mode_hitung = 'auto', presisi_hll = PRESISI_HLL):
+    tersimpan = _muat_dataset_tersimpan(path_data, folder_delta)
+
+    if tersimpan is not None:
+        data, manifest, snapshot = tersimpan
+    else:
+        data, versi = baca_data(path_data)
+        manifest = {'versi_dasar' : versi, 'versi' : versi, 'delta' : [], 'versi_padat' : versi, 'snapshot_delta' : [], 'baris_delta' : []}
+        snapshot = None if adalah_url(path_data) else path_snapshot(path_data, versi)
+
+    if snapshot is not None and not snapshot.exists():
+        snapshot = None
+
+    dataset = {
+        'path_data' : path_data,
+        'folder_delta' : Path(folder_delta),
+        'data' : data,
+        'cube' : buat_cube_paralel(data, snapshot, jumlah_proses, mode_hitung, presisi_hll),
+        'mode_hitung' : mode_hitung,
+        'presisi_hll' : presisi_hll,
+        'versi_dasar' : manifest['versi_dasar'],
+        'versi' : manifest['versi'],
+        'delta' : list(manifest['delta']),
+        'versi_padat' : manifest['versi_padat'],
+        'snapshot_delta' : list(manifest['snapshot_delta']),
+        'baris_delta' : list(manifest['baris_delta'])
+    }
+
+    sinkron_delta(dataset)
+
+    return (dataset)
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import streamlit
+import streamlit.logger
+from packaging.version import Version
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+LOGGER = logging.getLogger('telco.instrumentasi')
+
+# Versi streamlit yang sudah diuji untuk penghitung byte (ScriptRunContext._enqueue privat);
+# di luar rentang ini byte_terkirim tidak dihitung
+VERSI_STREAMLIT_TERUJI = (Version('1.66'), Version('2'))
+HITUNG_BYTE = VERSI_STREAMLIT_TERUJI[0] <= Version(streamlit.__version__) < VERSI_STREAMLIT_TERUJI[1]
+
+# State per run script (satu thread per session streamlit); total kumulatif dipakai bersama semua session
+_lokal = threading.local()
+_kunci_total = threading.Lock()
+_total = {}
+
+def rss():
+    # Resident memory proses saat ini (Linux); None jika /proc tidak tersedia
+    try:
+        with open('/proc/self/statm') as f:
+            return (int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE'))
+    except (OSError, ValueError):
+        return (None)
+
+def mode_bare():
+    # Skrip yang berjalan tanpa server streamlit (bare mode): peringatan bare mode tidak ditampilkan
+    streamlit.logger.set_log_level('error')
+
+def _siapkan_log():
+    # Log terstruktur (satu objek json per section) ke stderr
+    if not LOGGER.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+        LOGGER.addHandler(handler)
+        LOGGER.setLevel(logging.INFO)
+
+def mulai_run(aktif):
+    # Dipanggil di awal setiap run; instrumentasi hanya berjalan jika aktif (opt-in)
+    if aktif:
+        _siapkan_log()
+    _lokal.aktif = aktif
+    _lokal.catatan = []
+    _lokal.tumpukan = []
+    _lokal.thread_script = True
+
+def konteks_run():
+    # State run ini untuk dipasang di thread lain yang bekerja atas nama run yang sama
+    return ({'aktif' : aktif(), 'catatan' : getattr(_lokal, 'catatan', [])})
+
+def pasang_konteks(konteks):
+    # Catatan thread pool masuk ke daftar catatan run pemiliknya; tumpukan section tetap per thread
+    _lokal.aktif = konteks['aktif']
+    _lokal.catatan = konteks['catatan']
+    _lokal.tumpukan = []
+    _lokal.thread_script = False
+
+def aktif():
+    return (getattr(_lokal, 'aktif', False))
+
+def catatan_run():
+    return (list(getattr(_lokal, 'catatan', [])))
+
+def _catat_cache(jenis):
+    if aktif() and _lokal.tumpukan:
+        _lokal.tumpukan[-1][jenis] += 1
+
+def pantau_cache(cache):
+    # Bungkus decorator cache streamlit: panggilan dihitung di luar cache, miss dihitung di dalam
+    # (fungsi asli hanya dijalankan saat miss)
+    def dekorator(fungsi):
+        @wraps(fungsi)
+        def saat_miss(*args, **kwargs):
+            _catat_cache('cache_miss')
+            return (fungsi(*args, **kwargs))
+
+        tercache = cache(saat_miss)
+
+        @wraps(fungsi)
+        def panggil(*args, **kwargs):
+            _catat_cache('cache_panggil')
+            return (tercache(*args, **kwargs))
+
+        panggil.clear = tercache.clear
+        return (panggil)
+
+    return (dekorator)
+
+def _pasang_penghitung_byte(catatan):
+    # Byte ke browser = ukuran ForwardMsg yang dikirim selama bagian berjalan. Streamlit tidak punya hook
+    # publik untuk pesan keluar, jadi fungsi kirim privat ScriptRunContext dibungkus (hanya pada versi
+    # streamlit teruji); jika atributnya tidak ada / tidak bisa diganti, byte_terkirim tetap None
+    # Thread pool ikut memegang ScriptRunContext session, tetapi tidak mengirim elemen; fungsi kirim
+    # hanya dibungkus di thread script agar tidak diganti bersamaan dari beberapa thread
+    ctx = get_script_run_ctx(suppress_warning = True)
+    kirim_asli = getattr(ctx, '_enqueue', None)
+    if not HITUNG_BYTE or not getattr(_lokal, 'thread_script', True) or not callable(kirim_asli):
+        return (ctx, None)
+
+    def kirim(msg):
+        catatan['byte_terkirim'] += msg.ByteSize()
+        kirim_asli(msg)
+
+    try:
+        ctx._enqueue = kirim
+    except (AttributeError, TypeError):
+        return (ctx, None)
+
+    catatan['byte_terkirim'] = 0
+    return (ctx, kirim_asli)
+
+@contextmanager
+def bagian(nama, baris = None):
+    if not aktif():
+        yield
+        return
+
+    catatan = {'bagian' : nama, 'baris' : baris, 'byte_terkirim' : None, 'cache_panggil' : 0, 'cache_miss' : 0}
+    ctx, kirim_asli = _pasang_penghitung_byte(catatan)
+
+    _lokal.tumpukan.append(catatan)
+    rss_awal = rss()
+    mulai = time.perf_counter()
+    try:
+        yield
+    finally:
+        catatan['detik'] = time.perf_counter() - mulai
+        # RSS seluruh proses: ikut memuat alokasi session & thread lain yang berjalan bersamaan
+        rss_akhir = rss()
+        catatan['delta_rss_proses'] = None if rss_awal is None or rss_akhir is None else rss_akhir - rss_awal
+        catatan['cache_hit'] = catatan['cache_panggil'] - catatan['cache_miss']
+        _lokal.tumpukan.pop()
+        if kirim_asli is not None:
+            ctx._enqueue = kirim_asli
+
+        _lokal.catatan.append(catatan)
+        _tambah_total(catatan)
+        LOGGER.info(json.dumps(catatan))
+
+def ukur(nama, baris = None):
+    # Decorator section: `baris` menghitung jumlah baris yang discan dari argumen fungsi
+    def dekorator(fungsi):
+        @wraps(fungsi)
+        def bungkus(*args, **kwargs):
+            if not aktif():
+                return (fungsi(*args, **kwargs))
+            with bagian(nama, None if baris is None else int(baris(*args, **kwargs))):
+                return (fungsi(*args, **kwargs))
+
+        return (bungkus)
+
+    return (dekorator)
+
+def _tambah_total(catatan):
+    with _kunci_total:
+        total = _total.setdefault(catatan['bagian'], {'run' : 0, 'detik' : 0.0, 'byte_terkirim' : 0, 'cache_hit' : 0, 'cache_miss' : 0})
+        total['run'] += 1
+        total['detik'] += catatan['detik']
+        total['byte_terkirim'] += catatan['byte_terkirim'] or 0
+        total['cache_hit'] += catatan['cache_hit']
+        total['cache_miss'] += catatan['cache_miss']
+        total['terakhir'] = catatan
+
+def teks_prometheus():
+    # Format teks eksposisi Prometheus: counter kumulatif + gauge run terakhir per section
+    metrik = [
+        ('dashboard_section_runs_total', 'counter', lambda t: t['run']),
+        ('dashboard_section_seconds_total', 'counter', lambda t: t['detik']),
+        ('dashboard_section_bytes_sent_total', 'counter', lambda t: t['byte_terkirim']),
+        ('dashboard_section_cache_hits_total', 'counter', lambda t: t['cache_hit']),
+        ('dashboard_section_cache_misses_total', 'counter', lambda t: t['cache_miss']),
+        ('dashboard_section_last_seconds', 'gauge', lambda t: t['terakhir']['detik']),
+        ('dashboard_section_last_rows', 'gauge', lambda t: t['terakhir']['baris']),
+        ('dashboard_section_last_process_rss_delta_bytes', 'gauge', lambda t: t['terakhir']['delta_rss_proses'])
+    ]
+
+    with _kunci_total:
+        baris = []
+        for nama, jenis, nilai in metrik:
+            baris.append(f'# TYPE {nama} {jenis}')
+            for section, total in sorted(_total.items()):
+                if nilai(total) is not None:
+                    baris.append(f'{nama}{{section="{section}"}} {nilai(total)}')
+
+    return ('\n'.join(baris) + '\n')
+
+def tulis_prometheus(path):
+    # Ditulis atomic agar scraper (mis. node_exporter textfile collector) tidak membaca file setengah jadi
+    path_tmp = f'{path}.{os.getpid()}.tmp'
+    with open(path_tmp, 'w') as f:
+        f.write(teks_prometheus())
+    os.replace(path_tmp, path)
@@ -0,0 +1,173 @@
+import argparse
+import html
+import json
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from instrumentasi import mode_bare
+from pemuat_data import PATH_DATA, feather
+from agregasi import KOLOM_CUBE, SEMUA_STATUS, buat_cube, ke_records
+
+mode_bare()
+
+# Label segmen untuk baris yang nilai kolom segmennya kosong
+SEGMEN_KOSONG = 'unknown'
+
+WARNA_GENDER = {
+    'Male' : ('#0a75ad', ('#bfac60', '#0a75ad')),
+    'Female' : ('#ffc0cb', ('#469173', '#ffc0cb'))
+}
+
+def nama_file(teks):
+    return (re.sub(r'[^0-9A-Za-z]+', '-', str(teks)).strip('-').lower() or 'kosong')
+
+def angka_segmen(app, cube, versi):
+    # Angka di balik setiap section, memakai fungsi perhitungan yang sama dengan dashboard
+    cust_status, fig_status = app.perhitungan_customer_status(cube, versi)
+    churn_reason, fig_churn = app.perhitungan_churn_reason(cube, versi)
+    revenue = app.hitung_revenue_per_status(cube, versi)
+
+    indeks = app.buat_indeks_filter(cube)
+    agregat = app.agregat_demografi(indeks, SEMUA_STATUS)
+
+    figur = {'status' : fig_status}
+    if len(churn_reason) > 0:
+        figur['churn_reason'] = fig_churn
+
+    demografi = {}
+    for gender, (warna, warna_married) in WARNA_GENDER.items():
+        if gender not in agregat or agregat[gender]['total'] == 0:
+            continue
+        demografi[gender] = {
+            'total' : agregat[gender]['total'],
+            'kelompok_umur' : {f'{x}-{x + 9}' : float(y) for x, y in agregat[gender]['kelompok_umur'].items()},
+            'married' : {str(x) : float(y) for x, y in agregat[gender]['married'].items()},
+            'contract_internet' : ke_records(agregat[gender]['contract_internet'])
+        }
+        figur[f'umur_{gender}'] = app.distribusi_umur(agregat, gender = gender, color = warna)
+        figur[f'married_{gender}'] = app.married_status(agregat, gender = gender, color = warna_married)
+        figur[f'contract_{gender}'] = app.contract_type(agregat, gender = gender)
+
+    angka = {
+        'customer_status' : ke_records(cust_status[['customer_status', 'total_cust_status']]),
+        'churn_reason' : ke_records(churn_reason[['churn_category', 'churn_reason', 'total_cust_churn_per_reason']]),
+        'revenue' : ke_records(revenue[['customer_status', 'total_revenue']]),
+        'demografi' : demografi
+    }
+
+    return (angka, figur)
+
+def cube_segmen(sumber, mode_hitung):
+    # Sumber berupa (path snapshot Arrow, posisi baris): baris segmen diambil lewat memory-map di worker.
+    # Tanpa snapshot (mis. data dari URL) sumber berupa potongan frame segmen
+    if isinstance(sumber, tuple):
+        path_arrow, posisi = sumber
+        tabel = feather.read_table(path_arrow, columns = KOLOM_CUBE, memory_map = True)
+        sumber = tabel.take(posisi).to_pandas()
+
+    return (buat_cube(sumber, mode_hitung))
+
+def _render_segmen(tugas):
+    import plotly.io as pio
+    import FinalProjectStreamlit as app
+
+    kolom, nilai, sumber, mode_hitung, versi, folder_output, plotlyjs = tugas
+    cube = cube_segmen(sumber, mode_hitung)
+    angka, figur = angka_segmen(app, cube, f'{versi}:{kolom}={nilai}')
+    angka['segmen'] = {'kolom' : kolom, 'nilai' : str(nilai)}
+
+    # plotly.js disertakan sekali per halaman: 'directory' == <script src="plotly.min.js"> ke satu file bersama
+    # di folder output, 'inline' == html mandiri (~4.6 MB per halaman), 'cdn' == dimuat dari internet
+    bagian_html = []
+    for i, (nama, fig) in enumerate(figur.items()):
+        bagian_html.append(pio.to_html(fig, full_html = False, include_plotlyjs = plotlyjs if i == 0 else False, div_id = nama, validate = False))
+
+    judul = f'Telco Bangalore Churn Analysis - {kolom}: {nilai}'
+    tabel_status = ''.join(f"<li>{html.escape(str(x['customer_status']))}: {x['total_cust_status']}</li>" for x in angka['customer_status'])
+    tabel_revenue = ''.join(f"<li>{html.escape(str(x['customer_status']))}: ${x['total_revenue'] / 10**6:.2f}M</li>" for x in angka['revenue'])
+    halaman = f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{html.escape(judul)}</title></head>
+<body style="font-family: sans-serif;">
+<h1>{html.escape(judul)}</h1>
+<h2>Customer Status</h2><ul>{tabel_status}</ul>
+<h2>Impact On The Company</h2><ul>{tabel_revenue}</ul>
+{''.join(bagian_html)}
+</body>
+</html>
+"""
+
+    path = Path(folder_output) / f'{nama_file(kolom)}-{nama_file(nilai)}'
+    path.with_suffix('.html').write_text(halaman, encoding = 'utf-8')
+    path.with_suffix('.json').write_text(json.dumps(angka, indent = 2), encoding = 'utf-8')
+
+    return ({'kolom' : kolom, 'nilai' : str(nilai), 'file' : path.name, 'total_customer' : int(cube['total_customer'].sum())})
+
+def segmen(data, kolom):
+    # Posisi baris per nilai segmen; baris dengan nilai kosong dikumpulkan ke segmen SEGMEN_KOSONG
+    hasil = list(data.groupby(kolom, observed = True, sort = True).indices.items())
+    kosong = np.flatnonzero(data[kolom].isna().to_numpy())
+    if len(kosong) > 0:
+        hasil.append((SEGMEN_KOSONG, kosong))
+
+    return (hasil)
+
+def daftar_tugas(data, versi, path_arrow, daftar_kolom, folder_output, plotlyjs, mode_hitung):
+    # Data dimuat sekali; worker hanya menerima posisi baris segmen lalu membangun cube-nya sendiri
+    for kolom in daftar_kolom:
+        for nilai, posisi in segmen(data, kolom):
+            sumber = (str(path_arrow), posisi) if path_arrow is not None else data[KOLOM_CUBE].iloc[posisi]
+            yield ((kolom, nilai, sumber, mode_hitung, versi, folder_output, plotlyjs))
+
+def tulis_indeks(folder_output, ringkasan):
+    baris = ''.join(
+        f"<li><a href=\"{x['file']}.html\">{html.escape(x['kolom'])}: {html.escape(x['nilai'])}</a> ({x['total_customer']} customers)</li>"
+        for x in ringkasan
+    )
+    (Path(folder_output) / 'index.html').write_text(
+        f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Segment reports</title></head><body><ul>{baris}</ul></body></html>\n',
+        encoding = 'utf-8'
+    )
+    (Path(folder_output) / 'index.json').write_text(json.dumps(ringkasan, indent = 2), encoding = 'utf-8')
+
+def main():
+    from ingesti import muat_dataset, snapshot_dataset
+
+    parser = argparse.ArgumentParser(description = 'Laporan statis (HTML + JSON) per segmen tanpa server streamlit')
+    parser.add_argument('--data', default = str(PATH_DATA))
+    parser.add_argument('--by', action = 'append', required = True, help = 'kolom segmen, mis. city atau contract (boleh lebih dari satu)')
+    parser.add_argument('--output', default = 'laporan')
+    parser.add_argument('--workers', type = int, default = multiprocessing.cpu_count())
+    parser.add_argument('--plotlyjs', choices = ['directory', 'inline', 'cdn'], default = 'directory')
+    parser.add_argument('--count', choices = ['auto', 'exact', 'hll'], default = 'auto')
+    args = parser.parse_args()
+
+    mulai = time.perf_counter()
+    dataset = muat_dataset(args.data, mode_hitung = args.count)
+    data = dataset['data']
+
+    kolom_salah = [x for x in args.by if x not in data.columns]
+    if kolom_salah:
+        parser.error(f'unknown segment column(s): {", ".join(kolom_salah)}')
+
+    Path(args.output).mkdir(parents = True, exist_ok = True)
+    if args.plotlyjs == 'directory':
+        # Satu plotly.min.js di samping index.html dipakai semua halaman segmen (tetap bisa dibuka offline)
+        from plotly.offline import get_plotlyjs
+        (Path(args.output) / 'plotly.min.js').write_text(get_plotlyjs(), encoding = 'utf-8')
+    tugas = daftar_tugas(data, dataset['versi'], snapshot_dataset(dataset), args.by, args.output, True if args.plotlyjs == 'inline' else args.plotlyjs, args.count)
+
+    # Spawn: worker tidak mewarisi state streamlit/frame penuh dari proses utama
+    with ProcessPoolExecutor(args.workers, mp_context = multiprocessing.get_context('spawn')) as pool:
+        ringkasan = list(pool.map(_render_segmen, tugas))
+
+    tulis_indeks(args.output, ringkasan)
+    print(f'{len(ringkasan)} segment reports written to {args.output} in {time.perf_counter() - mulai:.1f} s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+FOLDER_APP = Path(__file__).resolve().parent
+PATH_APP = FOLDER_APP / 'FinalProjectStreamlit.py'
+
+# Modul yang diukur waktu impornya, masing-masing di proses python baru (tanpa cache modul)
+MODUL_DIUKUR = [
+    'numpy',
+    'pandas',
+    'pyarrow.feather',
+    'streamlit',
+    'plotly.graph_objects',
+    'pemuat_data',
+    'agregasi',
+    'ingesti'
+]
+
+def waktu_impor(modul):
+    kode = f'import time; t = time.perf_counter(); import {modul}; print(time.perf_counter() - t)'
+    hasil = subprocess.run([sys.executable, '-c', kode], cwd = FOLDER_APP, capture_output = True, text = True)
+    if hasil.returncode != 0:
+        return (None)
+
+    return (float(hasil.stdout.strip()))
+
+def waktu_render(argumen_app, jumlah_rerun):
+    # Render pertama (cache kosong) lalu rerun pada session yang sama (cache hangat), tanpa browser
+    from streamlit.testing.v1 import AppTest
+
+    sys.argv = [str(PATH_APP)] + argumen_app
+    app = AppTest.from_file(str(PATH_APP), default_timeout = 600)
+
+    waktu = []
+    for _ in range(1 + jumlah_rerun):
+        mulai = time.perf_counter()
+        app.run()
+        waktu.append(time.perf_counter() - mulai)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+
+    return (waktu)
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Laporan waktu impor & render pertama dashboard')
+    parser.add_argument('--rerun', type = int, default = 2)
+    parser.add_argument('--json', help = 'simpan laporan ke file json')
+    args, argumen_app = parser.parse_known_args()
+
+    laporan = {'impor' : {x : waktu_impor(x) for x in MODUL_DIUKUR}}
+    waktu = waktu_render(argumen_app, args.rerun)
+    laporan['render_pertama'] = waktu[0]
+    laporan['rerun'] = waktu[1:]
+
+    print(f"{'step':<28}{'seconds':>10}")
+    for modul, detik in laporan['impor'].items():
+        print(f"{'import ' + modul:<28}{'n/a' if detik is None else f'{detik:.3f}':>10}")
+    print(f"{'first render':<28}{laporan['render_pertama']:>10.3f}")
+    for i, detik in enumerate(laporan['rerun'], 1):
+        print(f"{f'rerun {i}':<28}{detik:>10.3f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(laporan, f, indent = 2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# Kolom layanan tambahan Yes/No (nilai kosong = layanan dasarnya tidak berlangganan, dihitung sebagai 'No')
+KOLOM_ADDON = [
+    'online_security',
+    'online_backup',
+    'device_protection_plan',
+    'premium_tech_support',
+    'streaming_tv',
+    'streaming_movies',
+    'streaming_music',
+    'unlimited_data',
+    'paperless_billing',
+    'multiple_lines'
+]
+
+# Jumlah word (64 customer per word) yang di-AND sekaligus saat menghitung pasangan (membatasi array sementara)
+UKURAN_BLOK = 1 << 13
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(bitset):
+        return (np.bitwise_count(bitset).sum(axis = -1, dtype = np.int64))
+else:
+    # numpy < 2.0: popcount lewat tabel 256 nilai per byte
+    _POPCOUNT_BYTE = np.array([bin(x).count('1') for x in range(256)], dtype = np.uint8)
+
+    def _popcount(bitset):
+        byte = bitset.view(np.uint8).reshape(*bitset.shape[:-1], -1)
+        return (_POPCOUNT_BYTE[byte].sum(axis = -1, dtype = np.int64))
+
+def _bitset(mask):
+    # Mask boolean -> bitset 64 customer per word uint64
+    bit = np.packbits(mask, bitorder = 'little')
+    bit = np.pad(bit, (0, -len(bit) % 8))
+
+    return (bit.view(np.uint64))
+
+def buat_bitset(data, kolom = KOLOM_ADDON):
+    # Satu bitset per add-on, per status customer & untuk customer churn; dibangun sekali per versi dataset
+    kolom = [x for x in kolom if x in data.columns]
+    status = data['customer_status']
+
+    return ({
+        'kolom' : kolom,
+        'addon' : np.stack([_bitset((data[x] == 'Yes').to_numpy(dtype = bool)) for x in kolom]),
+        'churn' : _bitset((status == 'Churned').to_numpy(dtype = bool)),
+        'status' : {x : _bitset((status == x).to_numpy(dtype = bool)) for x in status.dropna().unique()}
+    })
+
+def _hitung_pasangan(addon, churn):
+    # Jumlah customer & churn untuk setiap pasangan add-on: AND antar bitset lalu popcount,
+    # diproses per blok word agar array sementara (add-on x add-on x word) tetap kecil
+    jumlah = len(addon)
+    total = np.zeros((jumlah, jumlah), dtype = np.int64)
+    churned = np.zeros((jumlah, jumlah), dtype = np.int64)
+
+    for awal in range(0, addon.shape[1], UKURAN_BLOK):
+        blok = addon[:, awal:awal + UKURAN_BLOK]
+        irisan = blok[:, None, :] & blok[None, :, :]
+        total += _popcount(irisan)
+        churned += _popcount(irisan & churn[awal:awal + UKURAN_BLOK])
+
+    return (total, churned)
+
+def lift_addon(bitset, status):
+    # Churn rate & lift (churn rate kelompok / churn rate semua customer terpilih) untuk setiap
+    # add-on tunggal (diagonal) dan setiap pasangan add-on, hanya untuk customer dengan status terpilih
+    terpilih = np.zeros_like(bitset['churn'])
+    for x in status:
+        terpilih |= bitset['status'][x]
+
+    churn = bitset['churn'] & terpilih
+    total, churned = _hitung_pasangan(bitset['addon'] & terpilih, churn)
+
+    total_terpilih, churn_terpilih = _popcount(terpilih), _popcount(churn)
+    rate_dasar = churn_terpilih / total_terpilih if total_terpilih else np.nan
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        churn_rate = np.where(total > 0, churned / total, np.nan)
+        lift = churn_rate / rate_dasar
+
+    kolom = bitset['kolom']
+    i, j = np.triu_indices(len(kolom))
+    hasil = pd.DataFrame({
+        'addon_1' : [kolom[x] for x in i],
+        'addon_2' : [kolom[y] if x != y else None for x, y in zip(i, j)],
+        'total_customer' : total[i, j],
+        'churned' : churned[i, j],
+        'churn_rate' : churn_rate[i, j],
+        'lift' : lift[i, j]
+    })
+
+    return ({
+        'hasil' : hasil,
+        'lift' : pd.DataFrame(lift, index = kolom, columns = kolom),
+        'total_customer' : int(total_terpilih),
+        'churn_rate' : rate_dasar
+    })
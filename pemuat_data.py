@@ -0,0 +1,255 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from urllib.request import urlopen
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+FOLDER_APP = Path(__file__).resolve().parent
+PATH_DATA = FOLDER_APP / 'telecom_customer_churn.csv'
+PATH_KAMUS_DATA = FOLDER_APP / 'telecom_data_dictionary.csv'
+FOLDER_CACHE = FOLDER_APP / '.cache'
+
+LOGGER = logging.getLogger('telco.pemuat_data')
+
+# Naikkan setiap kali aturan skema di bawah berubah agar snapshot lama tidak terpakai
+VERSI_SKEMA = '2'
+
+# Kolom bilangan bulat kecil (tidak ada nilai kosong di data)
+KOLOM_INT_KECIL = {
+    'age' : 'int8',
+    'number_of_dependents' : 'int8',
+    'number_of_referrals' : 'int8',
+    'tenure_in_months' : 'int16'
+}
+
+# Kolom lokasi untuk peta churn (presisi float32 ~1 m sudah cukup untuk binning)
+KOLOM_GEO = {
+    'zip_code' : 'int32',
+    'latitude' : 'float32',
+    'longitude' : 'float32'
+}
+
+# Jumlah baris per chunk pada mode streaming
+UKURAN_CHUNK = 200_000
+
+# Nilai yang oleh pandas dibaca sebagai NaN (mis. 'None' pada Offer & Internet Type)
+NILAI_KOSONG = {'None', 'NA', 'N/A', 'NULL', 'null', 'nan', ''}
+
+def normalisasi_kolom(nama):
+    # Transformasi nama kolom menjadi lowercase & spasi menjadi underscore
+    return nama.strip().lower().replace(' ', '_')
+
+def kunci_kamus(nama):
+    # 'CustomerID' pada kamus data == 'Customer ID' pada file csv
+    return nama.lower().replace(' ', '').replace('_', '')
+
+def _domain_dari_deskripsi(deskripsi):
+    # Ambil daftar nilai setelah ':' (mis. "... gender: Male, Female"), abaikan keterangan dalam kurung
+    cocok = re.search(r':\s*([^()]+?)\s*(?:\(|$)', deskripsi)
+    if cocok is None:
+        return None
+
+    nilai = re.split(r',\s*(?:or\s+)?|\s+or\s+', cocok.group(1))
+    nilai = [x.strip() for x in nilai if x.strip() and x.strip() not in NILAI_KOSONG]
+    return (nilai if len(nilai) > 1 else None)
+
+def baca_skema(path_kamus = PATH_KAMUS_DATA):
+    # Skema eksplisit (nama kolom ternormalisasi -> dtype) dari telecom_data_dictionary.csv
+    kamus = pd.read_csv(path_kamus, encoding = 'cp1252')
+    kamus = kamus[kamus['Table'] == 'Customer Churn']
+
+    skema = {}
+    for field, deskripsi in zip(kamus['Field'], kamus['Description']):
+        domain = _domain_dari_deskripsi(deskripsi)
+        if domain is not None:
+            skema[kunci_kamus(field)] = pd.CategoricalDtype(domain)
+
+    for kolom, dtype in {**KOLOM_INT_KECIL, **KOLOM_GEO}.items():
+        skema[kunci_kamus(kolom)] = dtype
+
+    return (skema)
+
+def hash_file(*paths):
+    # Hash isi file (bukan waktu modifikasi) sebagai versi dataset
+    hasher = hashlib.sha256(VERSI_SKEMA.encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            for blok in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(blok)
+
+    return (hasher.hexdigest()[:16])
+
+def versi_frame(data):
+    # Versi dataset dari isi frame, untuk sumber yang tidak bisa di-hash sebagai file
+    hash_baris = pd.util.hash_pandas_object(data, index = False).values
+    return (hashlib.sha256(hash_baris.tobytes()).hexdigest()[:16])
+
+def _opsi_parse(path_data, path_kamus, kolom = None):
+    header = pd.read_csv(path_data, nrows = 0).columns
+    skema = baca_skema(path_kamus)
+
+    # Kolom yang tidak diminta tidak pernah diparsing; dtype diterapkan langsung saat membaca
+    if kolom is None:
+        kolom_dipakai = list(header)
+    else:
+        kolom_dipakai = [x for x in header if normalisasi_kolom(x) in kolom]
+    dtype = {x : skema[kunci_kamus(x)] for x in kolom_dipakai if kunci_kamus(x) in skema}
+
+    # Kolom kategori dibaca sebagai kategori bebas lalu dipersempit ke domain kamus oleh terapkan_domain,
+    # agar nilai di luar domain bisa dihitung (bukan langsung menjadi NaN tanpa jejak)
+    domain = {normalisasi_kolom(x) : y for x, y in dtype.items() if isinstance(y, pd.CategoricalDtype)}
+    dtype = {x : 'category' if isinstance(y, pd.CategoricalDtype) else y for x, y in dtype.items()}
+
+    return ({'usecols' : kolom_dipakai, 'dtype' : dtype}, domain)
+
+def terapkan_domain(data, domain):
+    # Nilai di luar domain kamus data menjadi NaN; jumlah nilai yang terbuang per kolom dikembalikan
+    asing = {}
+    for kolom, dtype in domain.items():
+        nilai = data[kolom]
+        jumlah = int((nilai.notna() & ~nilai.isin(dtype.categories)).sum())
+        if jumlah:
+            asing[kolom] = jumlah
+        data[kolom] = nilai.cat.set_categories(dtype.categories)
+
+    return (asing)
+
+def log_domain(path_data, asing):
+    if asing:
+        LOGGER.warning('%s: %d value(s) outside the data dictionary domains were read as empty (%s)',
+                       path_data, sum(asing.values()), ', '.join(f'{x}={y}' for x, y in asing.items()))
+
+def parse_csv(path_data, path_kamus = PATH_KAMUS_DATA, kolom = None):
+    opsi, domain = _opsi_parse(path_data, path_kamus, kolom)
+    data = pd.read_csv(path_data, **opsi)
+    data.columns = [normalisasi_kolom(x) for x in data.columns]
+    log_domain(path_data, terapkan_domain(data, domain))
+
+    return (data)
+
+def frame_kosong(path_data, path_kamus = PATH_KAMUS_DATA, kolom = None, sampel = 1000):
+    # Frame 0 baris dengan nama kolom & dtype hasil parse_csv (dtype kolom di luar skema
+    # diinferensi dari sampel baris awal)
+    opsi, domain = _opsi_parse(path_data, path_kamus, kolom)
+    data = pd.read_csv(path_data, nrows = sampel, **opsi).iloc[:0].copy()
+    data.columns = [normalisasi_kolom(x) for x in data.columns]
+    terapkan_domain(data, domain)
+
+    return (data)
+
+class _FileHash:
+    # Bungkus file agar hash isinya dihitung sambil dibaca pandas (cukup satu kali baca)
+    def __init__(self, f):
+        self.f = f
+        self.hasher = hashlib.sha256(VERSI_SKEMA.encode())
+
+    def read(self, ukuran = -1):
+        blok = self.f.read(ukuran)
+        self.hasher.update(blok)
+        return (blok)
+
+def lipat_csv(path_data, fungsi_lipat, akumulator, kolom = None, ukuran_chunk = UKURAN_CHUNK, path_kamus = PATH_KAMUS_DATA):
+    # Mode streaming: csv dibaca per chunk dan setiap chunk langsung dilipat ke akumulator,
+    # frame penuh tidak pernah disimpan di memori
+    opsi, domain = _opsi_parse(path_data, path_kamus, kolom)
+    nama_kolom = [normalisasi_kolom(x) for x in opsi['usecols']]
+
+    # Respon http dibungkus sama seperti file lokal, sehingga sumber URL juga punya versi hash isi
+    f = _FileHash(urlopen(path_data) if adalah_url(path_data) else open(path_data, 'rb'))
+
+    asing = {}
+    try:
+        for chunk in pd.read_csv(f, chunksize = ukuran_chunk, **opsi):
+            chunk.columns = nama_kolom
+            for x, y in terapkan_domain(chunk, domain).items():
+                asing[x] = asing.get(x, 0) + y
+            akumulator = fungsi_lipat(akumulator, chunk)
+    finally:
+        f.f.close()
+    log_domain(path_data, asing)
+
+    f.hasher.update(hash_file(path_kamus).encode())
+    return (akumulator, f.hasher.hexdigest()[:16])
+
+def adalah_url(path_data):
+    return (str(path_data).startswith(('http://', 'https://')))
+
+def tulis_atomic(path, tulis, pola_lama = None):
+    # File cache ditulis ke file sementara milik proses ini lalu di-rename (atomic): proses lain tidak
+    # pernah membaca file setengah jadi. `tulis(path_tmp)` mengisi file sementara; jika `pola_lama`
+    # diberikan, file lain di folder yang cocok dengan pola (versi lama) dihapus
+    path = Path(path)
+    path.parent.mkdir(parents = True, exist_ok = True)
+    path_tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    path_tmp.unlink(missing_ok = True)
+
+    try:
+        tulis(path_tmp)
+        os.replace(path_tmp, path)
+    except BaseException:
+        path_tmp.unlink(missing_ok = True)
+        raise
+
+    if pola_lama is not None:
+        for lama in path.parent.glob(pola_lama):
+            if lama != path:
+                lama.unlink(missing_ok = True)
+
+def path_snapshot(path_data, versi):
+    return (FOLDER_CACHE / f'{Path(path_data).stem}-{versi}.arrow')
+
+def _jalankan_partisi(fungsi, path_arrow, kolom, awal, jumlah, argumen):
+    # Worker membaca rentang barisnya sendiri dari snapshot Arrow lewat memory-map, frame tidak di-pickle
+    tabel = feather.read_table(path_arrow, columns = kolom, memory_map = True)
+    return (fungsi(tabel.slice(awal, jumlah).to_pandas(), *argumen))
+
+def map_partisi_arrow(fungsi, path_arrow, jumlah_baris, jumlah_proses, kolom, *argumen):
+    # Snapshot dipartisi per rentang baris lalu `fungsi(frame_partisi, *argumen)` dijalankan di process pool
+    # (spawn). `fungsi` harus fungsi level modul agar bisa di-pickle; hasil dikembalikan urut per partisi
+    ukuran_partisi = max(1, -(-jumlah_baris // jumlah_proses))
+    konteks = multiprocessing.get_context('spawn')
+
+    with ProcessPoolExecutor(max_workers = jumlah_proses, mp_context = konteks) as pool:
+        return (list(pool.map(
+            _jalankan_partisi,
+            repeat(fungsi),
+            repeat(str(path_arrow)),
+            repeat(kolom),
+            range(0, jumlah_baris, ukuran_partisi),
+            repeat(ukuran_partisi),
+            repeat(argumen)
+        )))
+
+def baca_data(path_data = PATH_DATA, path_kamus = PATH_KAMUS_DATA):
+    # Data dari URL tidak bisa di-hash sebelum diunduh, langsung parsing tanpa snapshot
+    if adalah_url(path_data) or feather is None:
+        data = parse_csv(path_data, path_kamus)
+        return (data, versi_frame(data))
+
+    versi = hash_file(path_data, path_kamus)
+    snapshot = path_snapshot(path_data, versi)
+
+    # Warm start: snapshot Arrow dibaca tanpa parsing ulang csv. Konversi ke pandas tetap menyalin
+    # kolom ke memori proses (setiap proses memegang frame sendiri); self_destruct melepas buffer Arrow
+    # per kolom selama konversi sehingga puncak memori ~1x frame, bukan 2x
+    if snapshot.exists():
+        tabel = feather.read_table(snapshot, memory_map = True)
+        return (tabel.to_pandas(split_blocks = True, self_destruct = True), versi)
+
+    data = parse_csv(path_data, path_kamus)
+
+    # Cold start: tulis snapshot (atomic) lalu hapus snapshot versi lama
+    tulis_atomic(snapshot, lambda x: feather.write_feather(data, x, compression = 'uncompressed'), f'{Path(path_data).stem}-*.arrow')
+
+    return (data, versi)
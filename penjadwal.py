@@ -0,0 +1,45 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from instrumentasi import bagian, konteks_run, pasang_konteks
+
+# Jumlah thread penghitung agregat section (satu per CPU, minimal 2), dipakai bersama semua session
+# dalam satu proses
+JUMLAH_THREAD = max(2, os.cpu_count() or 1)
+
+def _hitung(ctx, konteks, nama, hitung):
+    # Dijalankan di thread pool: hanya menghitung (mengisi cache agregat & figur), tanpa perintah streamlit.
+    # ScriptRunContext session pemilik tugas dipasang agar cache streamlit tidak memperingatkan
+    # "missing ScriptRunContext"; thread dipakai ulang oleh session lain, konteks diganti setiap tugas
+    if ctx is not None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+    pasang_konteks(konteks)
+    with bagian(f'hitung_{nama}'):
+        hitung()
+
+def batalkan(tugas):
+    # Tugas yang belum mulai dibatalkan; tugas yang sedang berjalan diselesaikan dan hasilnya
+    # tetap mengisi cache (thread python tidak bisa dihentikan di tengah jalan)
+    for future in (tugas or {}):
+        future.cancel()
+
+class PenjadwalBagian:
+    def __init__(self, jumlah_thread = JUMLAH_THREAD):
+        self.pool = ThreadPoolExecutor(max_workers = jumlah_thread, thread_name_prefix = 'bagian')
+
+    def jadwalkan(self, daftar_hitung, tugas_lama = None):
+        # Semua agregat section dihitung bersamaan; tugas run sebelumnya milik session yang sama
+        # (mis. filter status yang sudah diganti) dibatalkan lebih dulu agar tidak mengantre di depan
+        batalkan(tugas_lama)
+        ctx = get_script_run_ctx(suppress_warning = True)
+        konteks = konteks_run()
+
+        return ({self.pool.submit(_hitung, ctx, konteks, nama, hitung) : nama for nama, hitung in daftar_hitung.items()})
+
+    def selesai(self, tugas):
+        # Nama section sesuai urutan selesai dihitung; error dibiarkan muncul lagi saat section dirender
+        for future in as_completed(tugas):
+            yield (tugas[future])
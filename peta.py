@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+# Level peta: grid derajat (makin kecil makin detail) & agregat per kota / kode pos,
+# masing-masing dengan zoom awal peta
+LEVEL_PETA = {
+    'Region (1° grid)' : {'grid' : 1.0, 'zoom' : 4.5},
+    'Area (0.25° grid)' : {'grid' : 0.25, 'zoom' : 5.5},
+    'Local (0.05° grid)' : {'grid' : 0.05, 'zoom' : 6.5},
+    'City' : {'kolom' : 'city', 'zoom' : 5.5},
+    'ZIP' : {'kolom' : 'zip_code', 'zoom' : 6.5}
+}
+
+# Dimensi yang bisa difilter tanpa menyentuh data baris
+DIMENSI_PETA = ['contract', 'internet_type']
+LABEL_KOSONG = 'No Internet Service'
+
+def _kunci_sel(data, level):
+    if 'grid' in level:
+        ukuran = level['grid']
+        baris = np.floor(data['latitude'].to_numpy() / ukuran).astype(np.int64)
+        kolom = np.floor(data['longitude'].to_numpy() / ukuran).astype(np.int64)
+        # Indeks baris & kolom grid digabung jadi satu kunci int64 (tanpa string per customer)
+        return (baris * (1 << 32) + (kolom + (1 << 31)))
+
+    return (data[level['kolom']].to_numpy())
+
+def _isi_kosong(kolom):
+    # NaN diberi label agar bisa dipilih di filter (mis. internet_type kosong == tanpa layanan internet)
+    if kolom.isna().any():
+        kolom = kolom.cat.add_categories([LABEL_KOSONG]).fillna(LABEL_KOSONG)
+    return (kolom)
+
+def buat_bin_peta(data):
+    # Bin per level x sel x dimensi filter: jumlah customer, churn, revenue hilang & jumlah koordinat
+    # (untuk centroid). Bin bersifat aditif sehingga filter cukup menjumlahkan bin
+    churn = (data['customer_status'] == 'Churned').to_numpy()
+    dasar = pd.DataFrame({
+        **{x : _isi_kosong(data[x]) for x in DIMENSI_PETA},
+        'churned' : churn.astype(np.int64),
+        'revenue_hilang' : np.where(churn, data['total_revenue'].to_numpy(), 0.0),
+        'lat' : data['latitude'].to_numpy(dtype = 'float64'),
+        'lon' : data['longitude'].to_numpy(dtype = 'float64')
+    }, index = data.index)
+
+    hasil = {}
+    for nama, level in LEVEL_PETA.items():
+        dasar['sel'] = _kunci_sel(data, level)
+        hasil[nama] = dasar.groupby(['sel'] + DIMENSI_PETA, observed = True, dropna = False).agg(
+            total_customer = ('churned', 'size'),
+            churned = ('churned', 'sum'),
+            revenue_hilang = ('revenue_hilang', 'sum'),
+            jumlah_lat = ('lat', 'sum'),
+            jumlah_lon = ('lon', 'sum')
+        ).reset_index()
+
+    return (hasil)
+
+def sel_peta(bin_level, filter_dimensi = None):
+    # Filter + jumlah bin per sel; centroid = rata-rata koordinat customer dalam sel
+    mask = pd.Series(True, index = bin_level.index)
+    for dimensi, nilai in (filter_dimensi or {}).items():
+        mask &= bin_level[dimensi].isin(nilai)
+
+    sel = bin_level.loc[mask].groupby('sel', observed = True)[['total_customer', 'churned', 'revenue_hilang', 'jumlah_lat', 'jumlah_lon']].sum()
+    sel = sel[sel['total_customer'] > 0]
+
+    return (pd.DataFrame({
+        'sel' : sel.index.astype(str),
+        'latitude' : sel['jumlah_lat'] / sel['total_customer'],
+        'longitude' : sel['jumlah_lon'] / sel['total_customer'],
+        'total_customer' : sel['total_customer'],
+        'churned' : sel['churned'],
+        'churn_rate' : sel['churned'] / sel['total_customer'],
+        'revenue_hilang' : sel['revenue_hilang']
+    }).reset_index(drop = True))
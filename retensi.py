@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+# Dimensi segmen kurva retensi & label untuk nilai kosong
+DIMENSI_RETENSI = {
+    'contract' : 'Contract',
+    'offer' : 'Offer',
+    'internet_type' : 'Internet Type'
+}
+LABEL_KOSONG = {
+    'offer' : 'No Offer',
+    'internet_type' : 'No Internet Service'
+}
+TITIK_RETENSI = [12, 24, 36, 48, 60, 72]
+
+def matriks_tenure(data, dimensi):
+    # Matriks tenure x segmen berisi jumlah event (Churned) & censor (masih aktif) per bulan tenure
+    segmen = data[dimensi]
+    label = list(segmen.cat.categories)
+    kode = segmen.cat.codes.to_numpy().astype(np.int64)
+    if (kode < 0).any():
+        label.append(LABEL_KOSONG.get(dimensi, 'Unknown'))
+        kode = np.where(kode < 0, len(label) - 1, kode)
+
+    tenure = data['tenure_in_months'].to_numpy().astype(np.int64)
+    jumlah_tenure = int(tenure.max()) + 1 if len(tenure) else 1
+    posisi = tenure * len(label) + kode
+    churn = (data['customer_status'] == 'Churned').to_numpy()
+
+    ukuran = jumlah_tenure * len(label)
+    event = np.bincount(posisi[churn], minlength = ukuran).reshape(jumlah_tenure, len(label))
+    sensor = np.bincount(posisi[~churn], minlength = ukuran).reshape(jumlah_tenure, len(label))
+
+    return ({'label' : label, 'event' : event, 'sensor' : sensor})
+
+def kurva_kaplan_meier(matriks):
+    # S(t) = prod_{s<=t} (1 - d_s / n_s); n_s (customer berisiko) = jumlah kumulatif terbalik event + censor
+    event, sensor = matriks['event'], matriks['sensor']
+    berisiko = np.cumsum((event + sensor)[::-1], axis = 0)[::-1]
+    hazard = np.divide(event, berisiko, out = np.zeros(event.shape), where = berisiko > 0)
+    survival = np.cumprod(1 - hazard, axis = 0)
+
+    return (pd.DataFrame(survival, columns = matriks['label']).rename_axis('tenure_in_months'))
+
+def ringkasan_retensi(kurva, matriks, titik = TITIK_RETENSI):
+    # Retensi pada bulan tertentu + jumlah customer & churn per segmen
+    titik = [x for x in titik if x < len(kurva)]
+    hasil = kurva.iloc[titik].T
+    hasil.columns = [f'{x} months' for x in titik]
+    hasil.insert(0, 'Churned', matriks['event'].sum(axis = 0))
+    hasil.insert(0, 'Customers', (matriks['event'] + matriks['sensor']).sum(axis = 0))
+
+    return (hasil.rename_axis('Segment').reset_index())
@@ -0,0 +1,78 @@
+import numpy as np
+
+def buat_prekomputasi(data):
+    # Disiapkan sekali per versi dataset: per churn category, revenue customer churn diurutkan menurun
+    # beserta prefix sum-nya; per contract jumlah customer, churn & revenue churn
+    churn = (data['customer_status'] == 'Churned').to_numpy()
+    kategori = data['churn_category'].to_numpy()[churn]
+    revenue = data['total_revenue'].to_numpy(dtype = 'float64')[churn]
+    bulanan = data['monthly_charge'].to_numpy(dtype = 'float64')[churn]
+    contract = data['contract'].astype(str).to_numpy()
+
+    per_kategori = {}
+    for nama in data['churn_category'].cat.categories:
+        bagian = kategori == nama
+        urutan = np.argsort(-revenue[bagian], kind = 'stable')
+        per_kategori[nama] = {
+            'jumlah' : int(bagian.sum()),
+            # Elemen ke-k: total k customer dengan revenue terbesar (indeks 0 == 0)
+            'kumulatif_revenue' : np.concatenate([[0.0], np.cumsum(revenue[bagian][urutan])]),
+            'kumulatif_bulanan' : np.concatenate([[0.0], np.cumsum(bulanan[bagian][urutan])]),
+            'revenue_m2m' : float(revenue[bagian & (contract[churn] == 'Month-to-Month')].sum())
+        }
+
+    per_contract = {}
+    for nama in data['contract'].cat.categories:
+        bagian = contract == nama
+        per_contract[nama] = {
+            'jumlah' : int(bagian.sum()),
+            'churn' : int((bagian & churn).sum()),
+            'revenue_churn' : float(data['total_revenue'].to_numpy()[bagian & churn].sum()),
+            'bulanan_churn' : float(data['monthly_charge'].to_numpy()[bagian & churn].sum())
+        }
+
+    return ({'kategori' : per_kategori, 'contract' : per_contract, 'revenue_hilang' : float(revenue.sum())})
+
+def _ambil_kumulatif(kumulatif, persen, nilai_tertinggi):
+    # Jumlah untuk persen customer: k customer teratas (prefix sum) atau proporsional (rata-rata)
+    jumlah = len(kumulatif) - 1
+    if nilai_tertinggi:
+        return (float(kumulatif[int(np.ceil(jumlah * persen / 100))]))
+    return (float(kumulatif[-1] * persen / 100))
+
+def simulasi_retensi(prekomputasi, retensi_kategori, persen_konversi = 0, nilai_tertinggi = True):
+    # retensi_kategori: {churn_category: persen churn yang dipertahankan}. Semua hitungan memakai
+    # ringkasan prekomputasi (O(jumlah kategori)), data baris tidak disentuh
+    hasil_kategori = {}
+    sisa_m2m = 0.0
+    for nama, info in prekomputasi['kategori'].items():
+        persen = retensi_kategori.get(nama, 0)
+        revenue = _ambil_kumulatif(info['kumulatif_revenue'], persen, nilai_tertinggi)
+        total = info['kumulatif_revenue'][-1]
+        hasil_kategori[nama] = {
+            'customer' : int(np.ceil(info['jumlah'] * persen / 100)) if nilai_tertinggi else info['jumlah'] * persen / 100,
+            'revenue' : revenue,
+            'bulanan' : _ambil_kumulatif(info['kumulatif_bulanan'], persen, nilai_tertinggi)
+        }
+        # Revenue churn Month-to-Month yang tersisa setelah retensi (diasumsikan sebanding dengan porsi kategori)
+        sisa_m2m += info['revenue_m2m'] * (1 - revenue / total if total > 0 else 1)
+
+    # Konversi Month-to-Month -> One Year: customer yang dikonversi churn dengan rate One Year
+    m2m, satu_tahun = prekomputasi['contract']['Month-to-Month'], prekomputasi['contract']['One Year']
+    rate_m2m = m2m['churn'] / m2m['jumlah'] if m2m['jumlah'] else 0
+    rate_satu_tahun = satu_tahun['churn'] / satu_tahun['jumlah'] if satu_tahun['jumlah'] else 0
+    pengurangan = max(0.0, 1 - rate_satu_tahun / rate_m2m) if rate_m2m > 0 else 0.0
+    porsi_sisa = sisa_m2m / m2m['revenue_churn'] if m2m['revenue_churn'] else 0.0
+    konversi_revenue = float(sisa_m2m * pengurangan * persen_konversi / 100)
+    konversi_customer = float(m2m['churn'] * porsi_sisa * pengurangan * persen_konversi / 100)
+    konversi_bulanan = float(m2m['bulanan_churn'] * porsi_sisa * pengurangan * persen_konversi / 100)
+
+    revenue = sum(x['revenue'] for x in hasil_kategori.values()) + konversi_revenue
+    return ({
+        'kategori' : hasil_kategori,
+        'konversi' : {'customer' : konversi_customer, 'revenue' : konversi_revenue, 'bulanan' : konversi_bulanan},
+        'revenue' : revenue,
+        'bulanan' : sum(x['bulanan'] for x in hasil_kategori.values()) + konversi_bulanan,
+        'customer' : sum(x['customer'] for x in hasil_kategori.values()) + konversi_customer,
+        'porsi' : revenue / prekomputasi['revenue_hilang'] if prekomputasi['revenue_hilang'] else 0.0
+    })
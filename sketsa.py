@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# Presisi default HyperLogLog: 2**12 register per sketsa (4 KB), standard error ~1.6%
+PRESISI_HLL = 12
+
+# Rentang presisi yang didukung: di bawah 4 estimasi tidak stabil, di atas 16 sketsa per grup > 64 KB
+RENTANG_PRESISI_HLL = range(4, 17)
+
+def galat_hll(presisi):
+    # Standard error relatif estimasi HyperLogLog
+    return (1.04 / np.sqrt(2 ** presisi))
+
+def presisi_sketsa(register):
+    return (int(np.log2(register.shape[-1])))
+
+def hash_customer(customer_id):
+    # Hash 64-bit deterministik (tidak bergantung PYTHONHASHSEED) agar sketsa antar proses bisa digabung
+    return (pd.util.hash_pandas_object(customer_id.astype(str), index = False).to_numpy())
+
+def _panjang_bit(x):
+    # Jumlah bit signifikan per elemen uint64 (binary search tervektorisasi)
+    x = x.copy()
+    panjang = np.zeros(len(x), dtype = np.int64)
+    for geser in (32, 16, 8, 4, 2, 1):
+        besar = x >= np.uint64(1 << geser)
+        panjang += geser * besar
+        x = np.where(besar, x >> np.uint64(geser), x)
+
+    return (panjang + (x > 0))
+
+def sketsa_per_grup(kode_grup, jumlah_grup, hash64, presisi = PRESISI_HLL):
+    # Satu sketsa (array register uint8) per grup; register = posisi bit 1 pertama + 1
+    if presisi not in RENTANG_PRESISI_HLL:
+        raise ValueError(f'presisi HLL harus {RENTANG_PRESISI_HLL.start}-{RENTANG_PRESISI_HLL.stop - 1}: {presisi}')
+
+    bit_sisa = 64 - presisi
+    indeks = (hash64 >> np.uint64(bit_sisa)).astype(np.int64)
+    sisa = hash64 & np.uint64((1 << bit_sisa) - 1)
+    rank = (bit_sisa - _panjang_bit(sisa) + 1).astype(np.uint8)
+
+    register = np.zeros((jumlah_grup, 1 << presisi), dtype = np.uint8)
+    np.maximum.at(register, (kode_grup, indeks), rank)
+
+    return (register)
+
+def gabung_sketsa(kode_grup, jumlah_grup, register):
+    # Gabungan sketsa == maksimum register per posisi; urutan & partisi data tidak berpengaruh
+    hasil = np.zeros((jumlah_grup, register.shape[-1]), dtype = np.uint8)
+    np.maximum.at(hasil, kode_grup, register)
+
+    return (hasil)
+
+def estimasi_hll(register):
+    # Estimasi jumlah customer unik per sketsa, dengan koreksi linear counting untuk kardinalitas kecil
+    m = register.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimasi = alpha * m * m / np.sum(np.exp2(-register.astype('float64')), axis = -1)
+
+    register_nol = np.sum(register == 0, axis = -1)
+    kecil = (estimasi <= 2.5 * m) & (register_nol > 0)
+    linear = m * np.log(m / np.maximum(register_nol, 1))
+
+    return (np.where(kecil, linear, estimasi))
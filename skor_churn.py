@@ -0,0 +1,173 @@
+import argparse
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pemuat_data import FOLDER_CACHE, PATH_DATA, adalah_url, feather, map_partisi_arrow, tulis_atomic
+
+# Fitur model risiko churn: kolom layanan/kontrak (kategori, termasuk Yes/No) & tenure/tagihan (numerik)
+FITUR_KATEGORI = [
+    'married', 'offer', 'phone_service', 'multiple_lines', 'internet_service', 'internet_type',
+    'online_security', 'online_backup', 'device_protection_plan', 'premium_tech_support',
+    'streaming_tv', 'streaming_movies', 'streaming_music', 'unlimited_data',
+    'contract', 'paperless_billing', 'payment_method'
+]
+FITUR_NUMERIK = [
+    'age', 'number_of_dependents', 'number_of_referrals', 'tenure_in_months',
+    'avg_monthly_long_distance_charges', 'avg_monthly_gb_download', 'monthly_charge'
+]
+KOLOM_SKOR = FITUR_KATEGORI + FITUR_NUMERIK
+
+# Customer yang masih aktif (yang diberi skor risiko)
+STATUS_AKTIF = ['Stayed', 'Joined']
+
+UKURAN_CHUNK_SKOR = 200_000
+MAKS_SAMPEL_LATIH = 500_000
+LEBAR_KELOMPOK_TENURE = 12
+
+def buat_encoder(data):
+    # Kategori diambil dari dtype (skema kamus data), numerik distandarisasi dengan mean/std data latih
+    numerik = data[FITUR_NUMERIK].astype('float64')
+    return ({
+        'kategori' : {x : list(data[x].cat.categories) for x in FITUR_KATEGORI},
+        'rata' : numerik.mean().to_numpy(),
+        'std' : numerik.std().replace(0, 1).fillna(1).to_numpy()
+    })
+
+def encode(chunk, encoder):
+    # One-hot tervektorisasi dari kode kategori (NaN -> semua nol) + numerik terstandarisasi + bias
+    lebar = 1 + sum(len(x) for x in encoder['kategori'].values()) + len(FITUR_NUMERIK)
+    fitur = np.zeros((len(chunk), lebar), dtype = np.float32)
+    fitur[:, 0] = 1
+
+    baris = np.arange(len(chunk))
+    posisi = 1
+    for kolom, kategori in encoder['kategori'].items():
+        kode = pd.Categorical(chunk[kolom], categories = kategori).codes
+        ada = kode >= 0
+        fitur[baris[ada], posisi + kode[ada]] = 1
+        posisi += len(kategori)
+
+    numerik = (chunk[FITUR_NUMERIK].to_numpy(dtype = 'float64') - encoder['rata']) / encoder['std']
+    fitur[:, posisi:] = np.nan_to_num(numerik)
+
+    return (fitur)
+
+def _sigmoid(z):
+    return (1 / (1 + np.exp(-np.clip(z, -30, 30))))
+
+def latih_model(data, l2 = 1.0, iterasi = 25, seed = 0):
+    # Regresi logistik (Newton/IRLS + regularisasi L2) pada semua customer: label = status Churned.
+    # Data besar dilatih pada sampel acak; skor tetap dihitung untuk semua baris
+    if len(data) > MAKS_SAMPEL_LATIH:
+        data = data.sample(MAKS_SAMPEL_LATIH, random_state = seed)
+
+    encoder = buat_encoder(data)
+    x = encode(data, encoder).astype('float64')
+    y = (data['customer_status'] == 'Churned').to_numpy(dtype = 'float64')
+
+    penalti = np.full(x.shape[1], l2)
+    penalti[0] = 0
+    bobot = np.zeros(x.shape[1])
+    for _ in range(iterasi):
+        p = _sigmoid(x @ bobot)
+        gradien = x.T @ (p - y) + penalti * bobot
+        hessian = (x * (p * (1 - p))[:, None]).T @ x + np.diag(penalti)
+        langkah = np.linalg.solve(hessian, gradien)
+        bobot -= langkah
+        if np.abs(langkah).max() < 1e-6:
+            break
+
+    return ({'encoder' : encoder, 'bobot' : bobot.astype(np.float32)})
+
+def skor(chunk, model):
+    return (_sigmoid(encode(chunk, model['encoder']) @ model['bobot']).astype(np.float32))
+
+def skor_chunk(data, model, ukuran_chunk = UKURAN_CHUNK_SKOR):
+    # Matriks fitur dibuat per chunk agar memori tetap kecil untuk jutaan customer
+    hasil = np.empty(len(data), dtype = np.float32)
+    for awal in range(0, len(data), ukuran_chunk):
+        hasil[awal:awal + ukuran_chunk] = skor(data.iloc[awal:awal + ukuran_chunk], model)
+
+    return (hasil)
+
+def skor_paralel(data, model, path_arrow = None, jumlah_proses = 1, ukuran_chunk = UKURAN_CHUNK_SKOR):
+    if jumlah_proses <= 1 or path_arrow is None or feather is None:
+        return (skor_chunk(data, model, ukuran_chunk))
+
+    hasil = np.concatenate(map_partisi_arrow(skor_chunk, path_arrow, len(data), jumlah_proses, KOLOM_SKOR, model, ukuran_chunk))
+
+    # Snapshot tertinggal dari frame (mis. delta baru masuk di tengah jalan): skor ulang serial
+    if len(hasil) != len(data):
+        return (skor_chunk(data, model, ukuran_chunk))
+
+    return (hasil)
+
+def path_skor(path_data, versi):
+    return (FOLDER_CACHE / f'{Path(path_data).stem}.skor-{versi}.npy')
+
+def skor_dataset(data, path_data, versi, path_arrow = None, jumlah_proses = 1):
+    # Skor per versi dataset disimpan di disk: restart/proses lain tidak perlu melatih & menskor ulang
+    simpan = not adalah_url(path_data)
+    path = path_skor(path_data, versi)
+
+    if simpan and path.exists():
+        return (np.load(path, mmap_mode = 'r'))
+
+    hasil = skor_paralel(data, latih_model(data), path_arrow, jumlah_proses)
+
+    if simpan:
+        # np.save ke objek file agar nama file sementara tidak diberi akhiran .npy
+        def tulis(path_tmp):
+            with open(path_tmp, 'wb') as f:
+                np.save(f, hasil)
+
+        tulis_atomic(path, tulis, f'{Path(path_data).stem}.skor-*.npy')
+
+    return (hasil)
+
+def segmen_risiko(data, skor_customer, by = ('contract', 'internet_type', 'kelompok_tenure')):
+    # Ringkasan risiko customer aktif per segmen: jumlah, rata-rata risiko, ekspektasi churn & revenue bulanan berisiko
+    aktif = data['customer_status'].isin(STATUS_AKTIF).to_numpy()
+    segmen = pd.DataFrame({
+        'contract' : data['contract'].to_numpy()[aktif],
+        'internet_type' : data['internet_type'].to_numpy()[aktif],
+        'kelompok_tenure' : (data['tenure_in_months'].to_numpy()[aktif] // LEBAR_KELOMPOK_TENURE) * LEBAR_KELOMPOK_TENURE,
+        'risiko' : skor_customer[aktif],
+        'revenue_berisiko' : skor_customer[aktif] * data['monthly_charge'].to_numpy()[aktif]
+    })
+
+    hasil = segmen.groupby(list(by), observed = True, dropna = False).agg(
+        total_customer = ('risiko', 'size'),
+        rata_risiko = ('risiko', 'mean'),
+        ekspektasi_churn = ('risiko', 'sum'),
+        revenue_berisiko = ('revenue_berisiko', 'sum')
+    ).reset_index()
+
+    return (hasil.sort_values('ekspektasi_churn', ascending = False, ignore_index = True))
+
+def main():
+    from ingesti import FOLDER_DELTA, muat_dataset, snapshot_dataset
+
+    parser = argparse.ArgumentParser(description = 'Skor risiko churn semua customer aktif (batch malam)')
+    parser.add_argument('--data', default = str(PATH_DATA))
+    parser.add_argument('--workers', type = int, default = multiprocessing.cpu_count())
+    parser.add_argument('--output', default = 'skor_risiko.csv')
+    args = parser.parse_args()
+
+    dataset = muat_dataset(args.data, FOLDER_DELTA)
+    data = dataset['data']
+    skor_customer = skor_dataset(data, args.data, dataset['versi'], snapshot_dataset(dataset), args.workers)
+
+    aktif = data['customer_status'].isin(STATUS_AKTIF).to_numpy()
+    pd.DataFrame({
+        'customer_id' : data['customer_id'].to_numpy()[aktif],
+        'customer_status' : data['customer_status'].to_numpy()[aktif],
+        'risiko_churn' : skor_customer[aktif]
+    }).sort_values('risiko_churn', ascending = False).to_csv(args.output, index = False)
+    print(f'{aktif.sum()} active customers scored, written to {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from api_agregat import buat_server, cocok_etag
+from ingesti import muat_dataset
+
+ETAG = '"0123456789abcdef"'
+
+def test_cocok_etag_lemah():
+    assert cocok_etag(ETAG, ETAG)
+    assert cocok_etag(ETAG, f'W/{ETAG}')
+    assert cocok_etag(ETAG, f'"lain", W/{ETAG}')
+    assert not cocok_etag(ETAG, '"lain"')
+    assert not cocok_etag(ETAG, None)
+
+def test_cocok_etag_bintang():
+    assert cocok_etag(ETAG, '*')
+
+@pytest.fixture(scope = 'module')
+def url_api():
+    server = buat_server(muat_dataset(), port = 0)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    yield (f'http://127.0.0.1:{server.server_port}')
+    server.shutdown()
+
+def _kode(url, if_none_match, method = 'GET'):
+    permintaan = urllib.request.Request(url, method = method, headers = {'If-None-Match' : if_none_match})
+    try:
+        with urllib.request.urlopen(permintaan) as respon:
+            return (respon.status)
+    except urllib.error.HTTPError as e:
+        return (e.code)
+
+@pytest.mark.parametrize('method', ['GET', 'HEAD'])
+def test_304_untuk_etag_lemah_dan_bintang(url_api, method):
+    with urllib.request.urlopen(f'{url_api}/status') as respon:
+        etag = respon.headers['ETag']
+        json.load(respon)
+
+    assert _kode(f'{url_api}/status', f'W/{etag}', method) == 304
+    assert _kode(f'{url_api}/status', '*', method) == 304
+    assert _kode(f'{url_api}/status', '"lain"', method) == 200
@@ -0,0 +1,37 @@
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agregasi import KOLOM_SKETSA, baca_cube_streaming
+from pemuat_data import FOLDER_APP, PATH_DATA
+
+@pytest.fixture
+def url_data():
+    # Csv data dilayani lewat http lokal agar mode streaming membaca sumber URL
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(Handler, directory = str(FOLDER_APP)))
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    yield (f'http://127.0.0.1:{server.server_port}/{PATH_DATA.name}')
+    server.shutdown()
+
+def test_streaming_url_sama_dengan_file(url_data):
+    cube_url, versi_url = baca_cube_streaming(url_data, ukuran_chunk = 2000)
+    cube_file, versi_file = baca_cube_streaming(PATH_DATA, ukuran_chunk = 2000)
+
+    # Mode 'auto' di streaming selalu memakai sketsa HLL; versi URL = hash isi yang sama dengan file lokal
+    assert KOLOM_SKETSA in cube_url
+    assert versi_url is not None
+    assert versi_url == versi_file
+    assert cube_url['total_customer'].sum() == cube_file['total_customer'].sum()
+
+def test_ekstrak_data_streaming_url(url_data):
+    import FinalProjectStreamlit as app
+
+    dataset = app.ekstrak_data.__wrapped__(url_data, streaming = True, ukuran_chunk = 2000)
+    assert dataset['data'] is None
+    assert isinstance(dataset['versi'], str)
@@ -0,0 +1,216 @@
+import argparse
+import gc
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import streamlit
+
+from instrumentasi import LOGGER, VERSI_STREAMLIT_TERUJI, mode_bare, rss
+from pemuat_data import FOLDER_APP
+from agregasi import SEMUA_STATUS
+
+mode_bare()
+
+PATH_APP = FOLDER_APP / 'FinalProjectStreamlit.py'
+JUMLAH_SESI_DEFAULT = [1, 8, 32]
+
+def _persentil(nilai, q):
+    return (float(np.percentile(nilai, q)) if len(nilai) else float('nan'))
+
+@contextmanager
+def runtime_bersama():
+    # AppTest memasang mock Runtime singleton baru di setiap run lalu menghapusnya (tidak aman untuk run
+    # bersamaan). Di sini satu runtime dipakai semua session seperti satu proses server, dan AppTest
+    # diarahkan ke subclass Runtime sehingga pasang/hapus per run-nya tidak menyentuh runtime bersama.
+    # Script juga dikompilasi sekali ke ScriptCache bersama (AppTest membuat cache baru per run, dan
+    # kompilasi bersamaan dari banyak thread tidak aman di Python 3.11)
+    # Semua yang dipakai di sini adalah internal privat streamlit, diperiksa dulu agar versi lain gagal dengan jelas
+    try:
+        from streamlit.components.v2.component_manager import BidiComponentManager
+        from streamlit.runtime import Runtime
+        from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+        from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+        from streamlit.runtime.media_file_manager import MediaFileManager
+        from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+        from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+        from streamlit.testing.v1 import app_test, local_script_runner
+        from streamlit.testing.v1.util import patch_config_options
+
+        for modul, nama in [(app_test, 'Runtime'), (app_test, 'ScriptCache'), (local_script_runner, 'ScriptCache'), (Runtime, '_instance')]:
+            getattr(modul, nama)
+    except (ImportError, AttributeError) as e:
+        minimal, batas = VERSI_STREAMLIT_TERUJI
+        raise RuntimeError(
+            f'uji_beban.py relies on private Streamlit internals that are missing in streamlit {streamlit.__version__} '
+            f'(tested with >={minimal},<{batas}; see requirements.txt): {e}'
+        ) from e
+
+    runtime = MagicMock(spec = Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    runtime.bidi_component_registry = BidiComponentManager()
+    script_cache = ScriptCache()
+
+    class RuntimeSesi(Runtime):
+        pass
+
+    Runtime._instance = runtime
+    try:
+        with patch.object(app_test, 'Runtime', RuntimeSesi), patch.object(app_test, 'ScriptCache', lambda: script_cache), \
+             patch.object(local_script_runner, 'ScriptCache', lambda: script_cache), patch_config_options({'global.appTest' : True, 'logger.level' : 'error'}):
+            yield
+    finally:
+        Runtime._instance = None
+
+def _jalankan(app):
+    # Satu rerun script app; panel instrumentasi (?debug=1) di sidebar memuat catatan per section run ini
+    mulai = time.perf_counter()
+    app.run()
+    detik = time.perf_counter() - mulai
+
+    catatan = app.sidebar.dataframe[0].value if len(app.sidebar.dataframe) else pd.DataFrame(columns = ['bagian', 'detik', 'cache_miss'])
+    ekstrak = catatan.loc[catatan['bagian'] == 'ekstrak_data', 'detik']
+
+    return ({
+        'detik' : detik,
+        'error' : len(app.exception),
+        'detik_ekstrak' : float(ekstrak.iloc[0]) if len(ekstrak) else float('nan'),
+        'cache_miss' : int(catatan['cache_miss'].sum())
+    })
+
+def sesi(seed, jumlah_rerun, timeout, mulai_bersama):
+    # Satu analis: buka halaman, lalu berulang kali mengganti filter status demografi
+    from streamlit.testing.v1 import AppTest
+
+    acak = random.Random(seed)
+    app = AppTest.from_file(str(PATH_APP), default_timeout = timeout)
+    app.query_params['debug'] = '1'
+
+    mulai_bersama.wait()
+    buka = _jalankan(app)
+
+    rerun = []
+    for _ in range(jumlah_rerun if not buka['error'] else 0):
+        status = acak.sample(SEMUA_STATUS, acak.randint(1, len(SEMUA_STATUS)))
+        app.multiselect(key = 'status_demografi').set_value(status)
+        rerun.append(_jalankan(app))
+
+    return (app, buka, rerun)
+
+def uji_level(jumlah_sesi, jumlah_rerun, timeout, seed, bersihkan_cache):
+    # Semua session dimulai bersamaan di thread masing-masing (seperti session di satu server streamlit),
+    # sehingga cache_data/cache_resource dipakai & diperebutkan bersama
+    import streamlit as st
+
+    if bersihkan_cache:
+        st.cache_data.clear()
+
+    gc.collect()
+    rss_awal = rss()
+    mulai_bersama = threading.Barrier(jumlah_sesi)
+
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = jumlah_sesi) as pool:
+        hasil = list(pool.map(lambda i: sesi(seed + i, jumlah_rerun, timeout, mulai_bersama), range(jumlah_sesi)))
+    durasi = time.perf_counter() - mulai
+
+    # RSS diukur selagi semua session (state & elemen AppTest) masih hidup
+    gc.collect()
+    rss_akhir = rss()
+
+    buka = [x for _, b, _ in hasil for x in [b]]
+    rerun = [x for _, _, r in hasil for x in r]
+    waktu = [x['detik'] for x in rerun]
+    del hasil
+
+    return ({
+        'sesi' : jumlah_sesi,
+        'rerun' : len(rerun),
+        'p50_ms' : _persentil(waktu, 50) * 1000,
+        'p95_ms' : _persentil(waktu, 95) * 1000,
+        'p99_ms' : _persentil(waktu, 99) * 1000,
+        'buka_p95_ms' : _persentil([x['detik'] for x in buka], 95) * 1000,
+        'rerun_per_detik' : len(rerun) / durasi,
+        # Akses resource bersama (dataset cache_resource, lock delta) per rerun
+        'ekstrak_p95_ms' : _persentil([x['detik_ekstrak'] for x in rerun], 95) * 1000,
+        # Miss cache per rerun: > 0 pada filter yang sudah pernah dihitung = perhitungan duplikat antar session
+        'miss_per_rerun' : float(np.mean([x['cache_miss'] for x in rerun])) if rerun else float('nan'),
+        'rss_per_sesi_mb' : (rss_akhir - rss_awal) / jumlah_sesi / 2**20 if rss_awal is not None and rss_akhir is not None else float('nan'),
+        'error' : sum(x['error'] for x in buka + rerun)
+    })
+
+def cek_ambang(hasil, args):
+    # Pelanggaran ambang batas pada setiap level; slowdown = p95 level ini / p95 level pertama
+    pelanggaran = []
+    dasar = hasil[0]['p95_ms']
+    for level in hasil:
+        label = f"{level['sesi']} sessions"
+        if level['error']:
+            pelanggaran.append(f"{label}: {level['error']} runs raised an exception")
+        if args.max_p95 is not None and level['p95_ms'] > args.max_p95:
+            pelanggaran.append(f"{label}: p95 {level['p95_ms']:.0f} ms > {args.max_p95:.0f} ms")
+        if args.max_p99 is not None and level['p99_ms'] > args.max_p99:
+            pelanggaran.append(f"{label}: p99 {level['p99_ms']:.0f} ms > {args.max_p99:.0f} ms")
+        if args.max_rss_mb is not None and level['rss_per_sesi_mb'] > args.max_rss_mb:
+            pelanggaran.append(f"{label}: RSS growth {level['rss_per_sesi_mb']:.1f} MB/session > {args.max_rss_mb:.1f} MB")
+        if args.max_slowdown is not None and level['p95_ms'] / dasar > args.max_slowdown:
+            pelanggaran.append(f"{label}: p95 slowdown {level['p95_ms'] / dasar:.1f}x > {args.max_slowdown:.1f}x")
+
+    return (pelanggaran)
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Uji beban: N session bersamaan terhadap dashboard, tanpa browser')
+    parser.add_argument('--sessions', type = int, nargs = '+', default = JUMLAH_SESI_DEFAULT)
+    parser.add_argument('--reruns', type = int, default = 10, help = 'rerun (ganti filter status) per session')
+    parser.add_argument('--timeout', type = float, default = 600)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--clear-cache', action = 'store_true', help = 'kosongkan cache_data sebelum setiap level')
+    parser.add_argument('--max-p95', type = float, help = 'ms')
+    parser.add_argument('--max-p99', type = float, help = 'ms')
+    parser.add_argument('--max-rss-mb', type = float, help = 'MB per session')
+    parser.add_argument('--max-slowdown', type = float, help = 'p95 terhadap level pertama')
+    parser.add_argument('--json', help = 'simpan hasil ke file json')
+    args, argumen_app = parser.parse_known_args()
+
+    # Log json per section dari instrumentasi tidak dicetak (panel debug tetap dibaca dari sidebar)
+    LOGGER.addHandler(logging.NullHandler())
+    LOGGER.setLevel(logging.WARNING)
+
+    # Argumen sisa diteruskan ke app (mis. --streaming, --backend sqlite); data dimuat sekali sebelum pengukuran
+    sys.argv = [str(PATH_APP)] + argumen_app
+    with runtime_bersama():
+        app, _, _ = sesi(args.seed, 0, args.timeout, threading.Barrier(1))
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        del app
+
+        hasil = [uji_level(x, args.reruns, args.timeout, args.seed, args.clear_cache) for x in args.sessions]
+
+    print(f"{'sessions':>8}{'reruns':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'open p95':>10}{'rerun/s':>9}"
+          f"{'shared p95':>11}{'miss/rerun':>11}{'MB/session':>11}{'errors':>8}")
+    for x in hasil:
+        print(f"{x['sesi']:>8}{x['rerun']:>8}{x['p50_ms']:>9.0f}{x['p95_ms']:>9.0f}{x['p99_ms']:>9.0f}{x['buka_p95_ms']:>10.0f}"
+              f"{x['rerun_per_detik']:>9.1f}{x['ekstrak_p95_ms']:>11.1f}{x['miss_per_rerun']:>11.2f}{x['rss_per_sesi_mb']:>11.1f}{x['error']:>8}")
+
+    pelanggaran = cek_ambang(hasil, args)
+    for x in pelanggaran:
+        print(f'FAIL {x}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'hasil' : hasil, 'pelanggaran' : pelanggaran}, f, indent = 2)
+
+    return (1 if pelanggaran else 0)
+
+if __name__ == '__main__':
+    sys.exit(main())
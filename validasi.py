@@ -0,0 +1,150 @@
+import json
+import re
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pemuat_data import FOLDER_CACHE, PATH_KAMUS_DATA, UKURAN_CHUNK, adalah_url, baca_skema, hash_file, kunci_kamus, lipat_csv, normalisasi_kolom, tulis_atomic
+
+# Jumlah contoh customer_id yang disimpan per aturan
+JUMLAH_CONTOH = 5
+
+# Rentang nilai: jumlah, tenure & semua charge/revenue tidak boleh negatif (definisi di kamus data), koordinat valid
+RENTANG = {
+    'age' : (0, 120),
+    'number_of_dependents' : (0, None),
+    'number_of_referrals' : (0, None),
+    'tenure_in_months' : (0, None),
+    'latitude' : (-90, 90),
+    'longitude' : (-180, 180),
+    'avg_monthly_long_distance_charges' : (0, None),
+    'avg_monthly_gb_download' : (0, None),
+    'monthly_charge' : (0, None),
+    'total_charges' : (0, None),
+    'total_refunds' : (0, None),
+    'total_extra_data_charges' : (0, None),
+    'total_long_distance_charges' : (0, None),
+    'total_revenue' : (0, None)
+}
+
+# Total Revenue = Total Charges - Total Refunds + Total Extra Data Charges + Total Long Distance Charges (kamus data),
+# toleransi pembulatan sen
+IDENTITAS_REVENUE = ('total_revenue', {'total_charges' : 1, 'total_refunds' : -1, 'total_extra_data_charges' : 1, 'total_long_distance_charges' : 1})
+TOLERANSI_REVENUE = 0.01
+
+# Keterangan "(if the customer is not subscribed to ... service, this will be ...)" -> kolom layanan dasarnya
+LAYANAN_DASAR = {
+    'home phone' : 'phone_service',
+    'internet' : 'internet_service'
+}
+
+def _syarat_kosong(deskripsi):
+    # Kapan kolom boleh kosong menurut kamus data: None = tidak pernah, True = selalu,
+    # atau (kolom, nilai) = hanya jika kolom tersebut bernilai `nilai`
+    cocok = re.search(r'not subscribed to (home phone|internet) service', deskripsi)
+    if cocok is not None:
+        return ((LAYANAN_DASAR[cocok.group(1)], 'No'))
+    if 'when they leave the company' in deskripsi:
+        return (('customer_status', ('Joined', 'Stayed')))
+    if re.search(r':\s*None,', deskripsi):
+        return (True)
+    return (None)
+
+def aturan_kamus(path_kamus = PATH_KAMUS_DATA):
+    # Daftar aturan (nama, kolom, jenis, fungsi mask pelanggaran) yang diturunkan dari telecom_data_dictionary.csv
+    kamus = pd.read_csv(path_kamus, encoding = 'cp1252')
+    kamus = kamus[kamus['Table'] == 'Customer Churn']
+    skema = baca_skema(path_kamus)
+
+    aturan = [('customer_id unique', 'customer_id', 'uniqueness', lambda data: data['customer_id'].duplicated(keep = False).to_numpy())]
+
+    for field, deskripsi in zip(kamus['Field'], kamus['Description']):
+        kolom = normalisasi_kolom(re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', field))
+        syarat = _syarat_kosong(deskripsi)
+
+        # Nilai di luar domain kategori sudah menjadi kosong saat parsing, sehingga ikut tertangkap di sini
+        domain = isinstance(skema.get(kunci_kamus(field)), pd.CategoricalDtype)
+        jenis = 'nullability / domain' if domain else 'nullability'
+        if syarat is None:
+            aturan.append((f'{kolom} not null', kolom, jenis, lambda data, k = kolom: data[k].isna().to_numpy()))
+        elif syarat is not True:
+            kolom_syarat, nilai = syarat
+            nilai = nilai if isinstance(nilai, tuple) else (nilai,)
+            aturan.append((f"{kolom} null only if {kolom_syarat} is {' / '.join(nilai)}", kolom, jenis,
+                           lambda data, k = kolom, s = kolom_syarat, n = nilai: (data[k].isna() & ~data[s].isin(n)).to_numpy()))
+            if kolom_syarat == 'customer_status':
+                aturan.append((f'{kolom} present if {kolom_syarat} is Churned', kolom, jenis,
+                               lambda data, k = kolom, s = kolom_syarat: (data[k].isna() & (data[s] == 'Churned')).to_numpy()))
+
+    for kolom, (bawah, atas) in RENTANG.items():
+        teks = f'>= {bawah}' if atas is None else f'between {bawah} and {atas}'
+        aturan.append((f'{kolom} {teks}', kolom, 'range',
+                       lambda data, k = kolom, b = bawah, a = atas: ((data[k] < b) | (data[k] > (np.inf if a is None else a))).to_numpy()))
+
+    target, komponen = IDENTITAS_REVENUE
+    aturan.append((f"{target} = {' '.join(('+ ' if x > 0 else '- ') + k for k, x in komponen.items()).lstrip('+ ')}", target, 'revenue identity',
+                   lambda data: (np.abs(sum(x * data[k].to_numpy(dtype = 'float64') for k, x in komponen.items())
+                                        - data[target].to_numpy(dtype = 'float64')) > TOLERANSI_REVENUE)))
+
+    return (aturan)
+
+def validasi_frame(data, aturan):
+    # Semua aturan dievaluasi sebagai mask kolom dalam satu matriks (baris x aturan), lalu dijumlahkan sekaligus
+    aturan = [x for x in aturan if x[1] in data.columns]
+    mask = np.column_stack([fungsi(data) for _, _, _, fungsi in aturan]) if len(data) else np.zeros((0, len(aturan)), dtype = bool)
+    customer_id = data['customer_id'].to_numpy()
+
+    return ({
+        'total_baris' : len(data),
+        'aturan' : [
+            {
+                'aturan' : nama,
+                'kolom' : kolom,
+                'jenis' : jenis,
+                'pelanggaran' : int(mask[:, i].sum()),
+                'contoh' : [str(x) for x in customer_id[np.flatnonzero(mask[:, i])[:JUMLAH_CONTOH]]]
+            }
+            for i, (nama, kolom, jenis, _) in enumerate(aturan)
+        ]
+    })
+
+def _lipat_validasi(laporan, chunk, aturan):
+    # Mode streaming: laporan per chunk dijumlahkan (keunikan customer_id hanya dicek di dalam chunk)
+    hasil = validasi_frame(chunk, aturan)
+    if laporan is None:
+        return (hasil)
+
+    laporan['total_baris'] += hasil['total_baris']
+    for lama, baru in zip(laporan['aturan'], hasil['aturan']):
+        lama['pelanggaran'] += baru['pelanggaran']
+        lama['contoh'] = (lama['contoh'] + baru['contoh'])[:JUMLAH_CONTOH]
+
+    return (laporan)
+
+def path_validasi(path_data, versi):
+    return (FOLDER_CACHE / f'{Path(path_data).stem}.validasi-{versi}.json')
+
+def validasi_dataset(path_data, data = None, versi = None, ukuran_chunk = UKURAN_CHUNK, path_kamus = PATH_KAMUS_DATA):
+    # Laporan kualitas data per versi (hash isi file) disimpan di disk: warm start hanya membaca json.
+    # Tanpa frame (streaming / backend SQL), csv dilipat per chunk
+    simpan = not adalah_url(path_data)
+    if simpan and versi is None:
+        versi = hash_file(path_data, path_kamus)
+    path = path_validasi(path_data, versi)
+
+    if simpan and path.exists():
+        with open(path) as f:
+            return (json.load(f))
+
+    aturan = aturan_kamus(path_kamus)
+    if data is not None:
+        laporan = validasi_frame(data, aturan)
+    else:
+        laporan, _ = lipat_csv(path_data, partial(_lipat_validasi, aturan = aturan), None, ukuran_chunk = ukuran_chunk, path_kamus = path_kamus)
+
+    if simpan:
+        tulis_atomic(path, lambda x: x.write_text(json.dumps(laporan)), f'{Path(path_data).stem}.validasi-*.json')
+
+    return (laporan)